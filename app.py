@@ -1,254 +1,425 @@
 import os
-import sys
-from flask import Flask, request, jsonify, send_from_directory
-from flask_cors import CORS
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import orjson
+import ahocorasick
+import redis.asyncio as redis
+from quart import Quart, Response, request, send_from_directory
+from quart_cors import cors
 from shariah_audit_assistant import ShariahAuditAssistant
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-app = Flask(__name__, static_folder='static')
-CORS(app)  # Enable Cross-Origin Resource Sharing
+app = Quart(__name__, static_folder='static')
+app = cors(app, allow_origin="*")  # Enable Cross-Origin Resource Sharing
 
 # Initialize the assistant
 PDF_FOLDER = os.getenv("PDF_FOLDER", "./pdfs")
 USE_SEARCH = os.getenv("USE_SEARCH", "true").lower() == "true"
+# Threads available per worker for blocking assistant calls (LLM I/O waits)
+WORKER_THREADS = int(os.getenv("WORKER_THREADS", 32))
 
-try:
-    # Initialize without passing use_search parameter
-    assistant = ShariahAuditAssistant(pdf_folder=PDF_FOLDER)
-    print(f"✅ Successfully initialized Shariah Audit Assistant with PDF folder: {PDF_FOLDER}")
-    print(f"🔍 External search functionality is {'enabled' if USE_SEARCH else 'disabled'}")
-except Exception as e:
-    print(f"❌ Error initializing Shariah Audit Assistant: {e}")
-    sys.exit(1)
+# Response cache for the search/standards endpoints
+SEARCH_CACHE_TTL = 300
+STANDARDS_CACHE_TTL = 3600
+redis_client = redis.Redis(
+    host=os.getenv("REDIS_HOST", "localhost"),
+    port=int(os.getenv("REDIS_PORT", 6379)),
+    decode_responses=True,
+    socket_connect_timeout=0.5,
+    socket_timeout=0.5
+)
+# After a Redis failure, skip the cache for this many seconds instead of retrying every request
+REDIS_RETRY_AFTER = 30
+_redis_down_until = 0.0
+
+# The assistant loads the embedding model and vector DB, so it is created in the
+# background once serving starts (or on first use) rather than at import time
+_assistant = None
+_assistant_lock = threading.Lock()
+# Background task that builds and warms up the assistant once the worker starts serving
+_assistant_preload = None
+
+def get_assistant():
+    """
+    Return the shared ShariahAuditAssistant, initializing it on first call
+    """
+    global _assistant
+    if _assistant is None:
+        with _assistant_lock:
+            if _assistant is None:
+                try:
+                    _assistant = ShariahAuditAssistant(pdf_folder=PDF_FOLDER)
+                    print(f"✅ Successfully initialized Shariah Audit Assistant with PDF folder: {PDF_FOLDER}")
+                    print(f"🔍 External search functionality is {'enabled' if USE_SEARCH else 'disabled'}")
+                except Exception as e:
+                    print(f"❌ Error initializing Shariah Audit Assistant: {e}")
+                    raise
+    return _assistant
+
+def ojsonify(obj, status=200):
+    """
+    Serialize obj with orjson into a JSON response (drop-in for jsonify)
+    """
+    return Response(orjson.dumps(obj), status=status, mimetype="application/json")
+
+def redis_available():
+    """
+    False while backing off after a Redis failure
+    """
+    return time.monotonic() >= _redis_down_until
+
+def redis_failed(e):
+    """
+    Record a Redis failure: log it once and skip the cache for REDIS_RETRY_AFTER seconds
+    """
+    global _redis_down_until
+    if redis_available():
+        print(f"⚠️ Redis unavailable, serving uncached for {REDIS_RETRY_AFTER}s: {e}")
+    _redis_down_until = time.monotonic() + REDIS_RETRY_AFTER
+
+async def cache_get(key):
+    """
+    Return the cached JSON text for key, or None on a miss or if Redis is unavailable
+    """
+    if not redis_available():
+        return None
+    try:
+        return await redis_client.get(key)
+    except redis.RedisError as e:
+        redis_failed(e)
+        return None
+
+async def cache_set(key, ttl, payload):
+    """
+    Store a JSON payload under key for ttl seconds (best effort)
+    """
+    if not redis_available():
+        return
+    try:
+        await redis_client.setex(key, ttl, orjson.dumps(payload).decode())
+    except redis.RedisError as e:
+        redis_failed(e)
+
+async def preload_assistant():
+    """
+    Build (and warm up) the assistant off the event loop; errors are already
+    logged by get_assistant and retried on the next request
+    """
+    try:
+        await asyncio.to_thread(get_assistant)
+    except Exception:
+        pass
+
+@app.before_serving
+async def configure_executor():
+    """
+    Size the thread pool used by asyncio.to_thread for concurrent LLM-bound requests,
+    then start loading the assistant in the background so /health stays fast
+    while the first audit doesn't pay the warm-up cost
+    """
+    global _assistant_preload
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=WORKER_THREADS))
+    _assistant_preload = asyncio.create_task(preload_assistant())
 
 @app.route('/')
-def index():
+async def index():
     """
     Serve the main application page
     """
-    return send_from_directory('static', 'index.html')
+    return await send_from_directory('static', 'index.html')
 
 @app.route('/api/audit', methods=['POST'])
-def audit_product():
+async def audit_product():
     """
     API endpoint to audit a Shariah financial product
     """
-    if not request.json or 'product_text' not in request.json:
-        return jsonify({"error": "Missing product_text parameter"}), 400
+    data = await request.get_json(silent=True)
+    if not data or 'product_text' not in data:
+        return ojsonify({"error": "Missing product_text parameter"}, 400)
     
-    product_text = request.json['product_text']
-    use_search = request.json.get('use_search', USE_SEARCH)
+    product_text = data['product_text']
+    use_search = data.get('use_search', USE_SEARCH)
     
     try:
+        assistant = await asyncio.to_thread(get_assistant)
         # Pass use_search as a parameter to the audit_product_description method if it accepts it
         # Otherwise, just use the global USE_SEARCH value in your backend logic
-        result = assistant.audit_product_description(product_text)
+        result = await asyncio.to_thread(assistant.audit_product_description, product_text)
         
         # If your assistant doesn't handle search internally, you can add search results here
         if use_search and USE_SEARCH and 'violations' in result:
             # This is a placeholder - implement according to your actual search functionality
             pass
             
-        return jsonify(result)
+        return ojsonify(result)
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return ojsonify({"error": str(e)}, 500)
+
+@app.route('/api/audit-stream', methods=['POST'])
+async def audit_product_stream():
+    """
+    API endpoint to audit a Shariah financial product, streaming results as
+    newline-delimited JSON events as soon as each clause is assessed
+    """
+    data = await request.get_json(silent=True)
+    if not data or 'product_text' not in data:
+        return ojsonify({"error": "Missing product_text parameter"}, 400)
+    
+    product_text = data['product_text']
+    
+    async def generate():
+        try:
+            assistant = await asyncio.to_thread(get_assistant)
+            events = iter(assistant.iter_audit_product_description(product_text))
+            while True:
+                event = await asyncio.to_thread(next, events, None)
+                if event is None:
+                    break
+                yield orjson.dumps(event) + b"\n"
+        except Exception as e:
+            yield orjson.dumps({"type": "error", "data": {"error": str(e)}}) + b"\n"
+    
+    response = Response(generate(), mimetype="application/x-ndjson")
+    response.timeout = None  # audits can outlast Quart's default streaming timeout
+    return response
 
 @app.route('/api/extract', methods=['POST'])
-def extract_data():
+async def extract_data():
     """
     API endpoint to extract structured data from a product description
     """
-    if not request.json or 'product_text' not in request.json:
-        return jsonify({"error": "Missing product_text parameter"}), 400
+    data = await request.get_json(silent=True)
+    if not data or 'product_text' not in data:
+        return ojsonify({"error": "Missing product_text parameter"}, 400)
     
-    product_text = request.json['product_text']
+    product_text = data['product_text']
     
     try:
-        result = assistant.extract_structured_data(product_text)
-        return jsonify(result)
+        assistant = await asyncio.to_thread(get_assistant)
+        result = await asyncio.to_thread(assistant.extract_structured_data, product_text)
+        return ojsonify(result)
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return ojsonify({"error": str(e)}, 500)
 
 @app.route('/api/check-clause', methods=['POST'])
-def check_clause():
+async def check_clause():
     """
     API endpoint to check if a specific clause is Shariah compliant
     """
-    if not request.json or 'clause' not in request.json:
-        return jsonify({"error": "Missing clause parameter"}), 400
+    data = await request.get_json(silent=True)
+    if not data or 'clause' not in data:
+        return ojsonify({"error": "Missing clause parameter"}, 400)
     
-    clause = request.json['clause']
+    clause = data['clause']
     
     try:
-        result = assistant.check_clause_compliance(clause)
-        return jsonify(result)
+        assistant = await asyncio.to_thread(get_assistant)
+        result = await asyncio.to_thread(assistant.check_clause_compliance, clause)
+        return ojsonify(result)
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return ojsonify({"error": str(e)}, 500)
 
 @app.route('/api/search-standards', methods=['GET'])
-def search_standards():
+async def search_standards():
     """
     API endpoint to search for relevant Shariah standards
     """
     if not USE_SEARCH:
-        return jsonify({"error": "Search functionality is disabled"}), 400
+        return ojsonify({"error": "Search functionality is disabled"}, 400)
         
     query = request.args.get('query', '')
     if not query:
-        return jsonify({"error": "Missing query parameter"}), 400
+        return ojsonify({"error": "Missing query parameter"}, 400)
     
     max_results = int(request.args.get('max_results', 3))
     
+    cache_key = f"search:{query}:{max_results}"
+    cached = await cache_get(cache_key)
+    if cached is not None:
+        return Response(cached, mimetype="application/json")
+    
     try:
+        assistant = await asyncio.to_thread(get_assistant)
         # Implement a simple fallback if search_agent is not available
         if hasattr(assistant, 'search_agent') and assistant.search_agent:
-            results = assistant.search_agent.search_standards(query, max_results)
+            results = await asyncio.to_thread(assistant.search_agent.search_standards, query, max_results)
         else:
             # Fallback to simulated results
             results = simulate_search_results(query, max_results)
             
-        return jsonify({"results": results})
+        payload = {"results": results}
+        await cache_set(cache_key, SEARCH_CACHE_TTL, payload)
+        return ojsonify(payload)
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return ojsonify({"error": str(e)}, 500)
 
 @app.route('/api/standard-details', methods=['GET'])
-def get_standard_details():
+async def get_standard_details():
     """
     API endpoint to get detailed information about a specific Shariah standard
     """
     if not USE_SEARCH:
-        return jsonify({"error": "Search functionality is disabled"}), 400
+        return ojsonify({"error": "Search functionality is disabled"}, 400)
         
     reference = request.args.get('reference', '')
     if not reference:
-        return jsonify({"error": "Missing reference parameter"}), 400
+        return ojsonify({"error": "Missing reference parameter"}, 400)
+    
+    cache_key = f"standard:{reference}"
+    cached = await cache_get(cache_key)
+    if cached is not None:
+        return Response(cached, mimetype="application/json")
     
     try:
+        assistant = await asyncio.to_thread(get_assistant)
         # Check if get_standard_details is available in your assistant
         if hasattr(assistant, 'get_standard_details'):
-            details = assistant.get_standard_details(reference)
-            return jsonify(details)
+            details = await asyncio.to_thread(assistant.get_standard_details, reference)
         elif hasattr(assistant, 'search_agent') and hasattr(assistant.search_agent, 'get_detailed_standard'):
-            details = assistant.search_agent.get_detailed_standard(reference)
-            return jsonify(details)
+            details = await asyncio.to_thread(assistant.search_agent.get_detailed_standard, reference)
         else:
             # Fallback to simulated results
             details = simulate_standard_details(reference)
-            return jsonify(details)
+        await cache_set(cache_key, STANDARDS_CACHE_TTL, details)
+        return ojsonify(details)
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return ojsonify({"error": str(e)}, 500)
 
 @app.route('/api/find-source', methods=['POST'])
-def find_source():
+async def find_source():
     """
     API endpoint to find source information for a clause
     """
-    if not request.json or 'clause' not in request.json:
-        return jsonify({"error": "Missing clause parameter"}), 400
+    data = await request.get_json(silent=True)
+    if not data or 'clause' not in data:
+        return ojsonify({"error": "Missing clause parameter"}, 400)
     
-    clause = request.json['clause']
+    clause = data['clause']
     
     try:
-        source_info = assistant.find_source_for_clause(clause)
+        assistant = await asyncio.to_thread(get_assistant)
+        source_info = await asyncio.to_thread(assistant.find_source_for_clause, clause)
         if source_info:
-            return jsonify(source_info)
+            return ojsonify(source_info)
         else:
-            return jsonify({"error": "No source found"}), 404
+            return ojsonify({"error": "No source found"}, 404)
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return ojsonify({"error": str(e)}, 500)
 
 @app.route('/api/applicable-standards', methods=['GET'])
-def get_applicable_standards():
+async def get_applicable_standards():
     """
     API endpoint to get applicable Shariah standards for a product type
     """
     if not USE_SEARCH:
-        return jsonify({"error": "Search functionality is disabled"}), 400
+        return ojsonify({"error": "Search functionality is disabled"}, 400)
         
     product_type = request.args.get('product_type', '')
     if not product_type:
-        return jsonify({"error": "Missing product_type parameter"}), 400
+        return ojsonify({"error": "Missing product_type parameter"}, 400)
+    
+    cache_key = f"applicable:{product_type}"
+    cached = await cache_get(cache_key)
+    if cached is not None:
+        return Response(cached, mimetype="application/json")
     
     try:
+        assistant = await asyncio.to_thread(get_assistant)
         # Check if get_applicable_standards is available in your assistant
         if hasattr(assistant, 'get_applicable_standards'):
-            standards = assistant.get_applicable_standards(product_type)
-            return jsonify({"standards": standards})
+            standards = await asyncio.to_thread(assistant.get_applicable_standards, product_type)
         elif hasattr(assistant, 'search_agent'):
             # Fallback to search_agent if available
-            standards = assistant.search_agent.search_standards(product_type, 5)
-            return jsonify({"standards": standards})
+            standards = await asyncio.to_thread(assistant.search_agent.search_standards, product_type, 5)
         else:
             # Fallback to simulated results
             standards = simulate_applicable_standards(product_type)
-            return jsonify({"standards": standards})
+        payload = {"standards": standards}
+        await cache_set(cache_key, STANDARDS_CACHE_TTL, payload)
+        return ojsonify(payload)
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return ojsonify({"error": str(e)}, 500)
 
 @app.route('/health', methods=['GET'])
-def health_check():
+async def health_check():
     """
     API endpoint to check if the service is running
     """
-    return jsonify({
+    return ojsonify({
         "status": "healthy", 
         "pdf_folder": PDF_FOLDER,
-        "search_enabled": USE_SEARCH
+        "search_enabled": USE_SEARCH,
+        "assistant_loaded": _assistant is not None
     })
 
 # Helper functions for simulating search results when actual search is not available
+
+def _build_keyword_automaton(rules):
+    """
+    Compile the keywords of (keywords, entry) rules into one Aho-Corasick automaton
+    whose payload is the rule index, so a text is scanned once for all keywords
+    """
+    automaton = ahocorasick.Automaton()
+    for index, (keywords, _) in enumerate(rules):
+        for keyword in keywords:
+            automaton.add_word(keyword, index)
+    automaton.make_automaton()
+    return automaton
+
+def _matched_rules(automaton, text):
+    """Return the indices of the rules whose keywords occur in text, in rule order"""
+    return sorted({index for _, index in automaton.iter(text.lower())})
+
+_SIMULATED_SEARCH_RULES = (
+    (("murabaha",), {
+        "title": "Murabaha (Cost-Plus Financing)",
+        "snippet": "Murabaha is a sale contract where the seller explicitly declares the cost and profit margin. In Islamic banking, the bank purchases an asset and sells it to the client at a markup.",
+        "source": "AAOIFI Shariah Standard No. 8"
+    }),
+    (("riba", "interest"), {
+        "title": "Prohibition of Riba (Interest)",
+        "snippet": "Riba is strictly prohibited in Islamic finance. It refers to any excess compensation without due consideration. This includes interest on loans and investments.",
+        "source": "AAOIFI Shariah Standard No. 21"
+    }),
+    (("gharar", "uncertainty"), {
+        "title": "Prohibition of Gharar (Uncertainty)",
+        "snippet": "Gharar refers to excessive uncertainty or ambiguity in contracts. Islamic finance requires that all terms and conditions be clear, transparent and certain.",
+        "source": "AAOIFI Shariah Standard No. 31"
+    }),
+    (("penalty", "default"), {
+        "title": "Late Payment Guidelines",
+        "snippet": "Late payment penalties that generate profit for the lender are not permissible. However, penalties directed to charity may be allowed to discourage deliberate default.",
+        "source": "AAOIFI Shariah Standard No. 3"
+    }),
+    (("bonds", "sukuk"), {
+        "title": "Sukuk (Islamic Bonds)",
+        "snippet": "Conventional bonds are not Shariah-compliant due to their interest-based nature. Sukuk are the Islamic alternative, representing ownership in an underlying asset.",
+        "source": "AAOIFI Shariah Standard No. 17"
+    }),
+)
+_SIMULATED_SEARCH_AUTOMATON = _build_keyword_automaton(_SIMULATED_SEARCH_RULES)
+
+_GENERAL_PRINCIPLES_RESULT = {
+    "title": "General Shariah Compliance Principles",
+    "snippet": "Islamic finance prohibits interest (riba), excessive uncertainty (gharar), gambling (maysir), and investment in prohibited activities (haram).",
+    "source": "General Shariah Principles"
+}
+
 def simulate_search_results(query, max_results=3):
     """Simulate search results for when actual search functionality is not available"""
-    query = query.lower()
-    
-    # Basic dictionary of common Shariah finance concepts
-    results = []
-    
-    if 'murabaha' in query:
-        results.append({
-            "title": "Murabaha (Cost-Plus Financing)",
-            "snippet": "Murabaha is a sale contract where the seller explicitly declares the cost and profit margin. In Islamic banking, the bank purchases an asset and sells it to the client at a markup.",
-            "source": "AAOIFI Shariah Standard No. 8"
-        })
-    
-    if 'riba' in query or 'interest' in query:
-        results.append({
-            "title": "Prohibition of Riba (Interest)",
-            "snippet": "Riba is strictly prohibited in Islamic finance. It refers to any excess compensation without due consideration. This includes interest on loans and investments.",
-            "source": "AAOIFI Shariah Standard No. 21"
-        })
-    
-    if 'gharar' in query or 'uncertainty' in query:
-        results.append({
-            "title": "Prohibition of Gharar (Uncertainty)",
-            "snippet": "Gharar refers to excessive uncertainty or ambiguity in contracts. Islamic finance requires that all terms and conditions be clear, transparent and certain.",
-            "source": "AAOIFI Shariah Standard No. 31"
-        })
-    
-    if 'penalty' in query or 'default' in query:
-        results.append({
-            "title": "Late Payment Guidelines",
-            "snippet": "Late payment penalties that generate profit for the lender are not permissible. However, penalties directed to charity may be allowed to discourage deliberate default.",
-            "source": "AAOIFI Shariah Standard No. 3"
-        })
-    
-    if 'bonds' in query or 'sukuk' in query:
-        results.append({
-            "title": "Sukuk (Islamic Bonds)",
-            "snippet": "Conventional bonds are not Shariah-compliant due to their interest-based nature. Sukuk are the Islamic alternative, representing ownership in an underlying asset.",
-            "source": "AAOIFI Shariah Standard No. 17"
-        })
+    results = [
+        dict(_SIMULATED_SEARCH_RULES[index][1])
+        for index in _matched_rules(_SIMULATED_SEARCH_AUTOMATON, query)
+    ]
     
     # If no specific matches or not enough results, add general Islamic finance principles
     if len(results) < max_results:
-        results.append({
-            "title": "General Shariah Compliance Principles",
-            "snippet": "Islamic finance prohibits interest (riba), excessive uncertainty (gharar), gambling (maysir), and investment in prohibited activities (haram).",
-            "source": "General Shariah Principles"
-        })
+        results.append(dict(_GENERAL_PRINCIPLES_RESULT))
     
     return results[:max_results]
 
@@ -296,68 +467,72 @@ def simulate_standard_details(reference):
         "source": "Simulated Response"
     }
 
-def simulate_applicable_standards(product_type):
-    """Simulate applicable standards for a product type when actual functionality is not available"""
-    product_type = product_type.lower()
-    
-    standards = []
-    
-    if 'murabaha' in product_type:
-        standards.append({
-            "title": "AAOIFI Shariah Standard No. 8: Murabaha",
-            "summary": "Guidelines for Murabaha transactions in Islamic finance",
-            "source": "AAOIFI"
-        })
-    
-    if 'ijarah' in product_type or 'lease' in product_type:
-        standards.append({
-            "title": "AAOIFI Shariah Standard No. 9: Ijarah",
-            "summary": "Guidelines for Ijarah (leasing) transactions in Islamic finance",
-            "source": "AAOIFI"
-        })
-    
-    if 'sukuk' in product_type or 'bond' in product_type:
-        standards.append({
-            "title": "AAOIFI Shariah Standard No. 17: Investment Sukuk",
-            "summary": "Guidelines for Sukuk (Islamic bonds) in Islamic finance",
-            "source": "AAOIFI"
-        })
-    
-    if 'takaful' in product_type or 'insurance' in product_type:
-        standards.append({
-            "title": "AAOIFI Shariah Standard No. 26: Takaful",
-            "summary": "Guidelines for Islamic insurance (Takaful) in Islamic finance",
-            "source": "AAOIFI"
-        })
-    
-    # Add general standards that apply to all Islamic financial products
-    standards.append({
+_APPLICABLE_STANDARDS_RULES = (
+    (("murabaha",), {
+        "title": "AAOIFI Shariah Standard No. 8: Murabaha",
+        "summary": "Guidelines for Murabaha transactions in Islamic finance",
+        "source": "AAOIFI"
+    }),
+    (("ijarah", "lease"), {
+        "title": "AAOIFI Shariah Standard No. 9: Ijarah",
+        "summary": "Guidelines for Ijarah (leasing) transactions in Islamic finance",
+        "source": "AAOIFI"
+    }),
+    (("sukuk", "bond"), {
+        "title": "AAOIFI Shariah Standard No. 17: Investment Sukuk",
+        "summary": "Guidelines for Sukuk (Islamic bonds) in Islamic finance",
+        "source": "AAOIFI"
+    }),
+    (("takaful", "insurance"), {
+        "title": "AAOIFI Shariah Standard No. 26: Takaful",
+        "summary": "Guidelines for Islamic insurance (Takaful) in Islamic finance",
+        "source": "AAOIFI"
+    }),
+)
+_APPLICABLE_STANDARDS_AUTOMATON = _build_keyword_automaton(_APPLICABLE_STANDARDS_RULES)
+
+# General standards that apply to all Islamic financial products
+_GENERAL_STANDARDS = (
+    {
         "title": "AAOIFI Shariah Standard No. 21: Financial Papers",
         "summary": "General guidelines for financial instruments in Islamic finance",
         "source": "AAOIFI"
-    })
-    
-    standards.append({
+    },
+    {
         "title": "AAOIFI Shariah Standard No. 1: Trading in Currencies",
         "summary": "Guidelines for currency exchange in Islamic finance",
         "source": "AAOIFI"
-    })
-    
-    # For Islamic finance in general
-    if 'islamic finance' in product_type or 'shariah' in product_type:
-        standards.append({
-            "title": "AAOIFI Conceptual Framework",
-            "summary": "Foundational principles for Islamic financial products and services",
-            "source": "AAOIFI"
-        })
-    
+    },
+)
+
+# For Islamic finance in general
+_CONCEPTUAL_FRAMEWORK_RULES = (
+    (("islamic finance", "shariah"), {
+        "title": "AAOIFI Conceptual Framework",
+        "summary": "Foundational principles for Islamic financial products and services",
+        "source": "AAOIFI"
+    }),
+)
+_CONCEPTUAL_FRAMEWORK_AUTOMATON = _build_keyword_automaton(_CONCEPTUAL_FRAMEWORK_RULES)
+
+def simulate_applicable_standards(product_type):
+    """Simulate applicable standards for a product type when actual functionality is not available"""
+    standards = [
+        dict(_APPLICABLE_STANDARDS_RULES[index][1])
+        for index in _matched_rules(_APPLICABLE_STANDARDS_AUTOMATON, product_type)
+    ]
+    standards.extend(dict(standard) for standard in _GENERAL_STANDARDS)
+    standards.extend(
+        dict(_CONCEPTUAL_FRAMEWORK_RULES[index][1])
+        for index in _matched_rules(_CONCEPTUAL_FRAMEWORK_AUTOMATON, product_type)
+    )
     return standards
 
 if __name__ == '__main__':
     # Make sure PDF folder exists
     os.makedirs(PDF_FOLDER, exist_ok=True)
     
-    # Start the Flask app
+    # Start the development server (use uvicorn in production)
     port = int(os.getenv("PORT", 5000))
     print(f"🚀 Starting Shariah Audit Assistant API on port {port}")
     app.run(host='0.0.0.0', port=port, debug=False)
@@ -0,0 +1,24 @@
+"""
+Gunicorn configuration for the Shariah Audit Assistant API.
+
+Run with:  gunicorn app:app
+The app is ASGI (Quart), so each worker runs a uvicorn event loop; blocking
+LLM calls are offloaded to the loop's thread pool (WORKER_THREADS in app.py).
+"""
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+# Each async worker overlaps many requests on one event loop, and each loads its own
+# embedding model, so default to one worker per core (capped) rather than 2 * CPUs + 1
+workers = int(os.getenv("WEB_CONCURRENCY", min(multiprocessing.cpu_count(), 4)))
+# Exported so each worker can take its share of the per-key Together rate limit
+os.environ["WEB_CONCURRENCY"] = str(workers)
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Keep client/proxy connections open between requests instead of re-handshaking
+keepalive = 30
+
+# Audits wait on several LLM round-trips; don't kill workers mid-request
+timeout = 180
+graceful_timeout = 30
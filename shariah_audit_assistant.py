@@ -1,13 +1,30 @@
 import os
 import re
-import json
 import time
-from typing import List, Dict, Any, Optional
-from langchain_community.document_loaders import PyPDFLoader
+import fcntl
+import shutil
+import sqlite3
+import hashlib
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Iterator, Optional
+import numpy as np
+import orjson
+import ahocorasick
+import requests
+from requests.adapters import HTTPAdapter
+import torch
+import pypdfium2 as pdfium
 from langchain_community.vectorstores import Chroma
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_community.embeddings import HuggingFaceEmbeddings
+from langchain_core.embeddings import Embeddings
+from langchain_core.documents import Document
 from langchain_together import Together
+from langchain.globals import set_llm_cache
+from langchain_community.cache import SQLiteCache
 from dotenv import load_dotenv
 from tenacity import retry, wait_exponential, stop_after_attempt, retry_if_exception_type
 
@@ -18,44 +35,465 @@ load_dotenv()
 TOGETHER_API_KEY = os.getenv("TOGETHER_API_KEY", "e5126de3e93510fc8f8cac65e28c9351a54ee255d72a0c26ae612794bcf9f0bc")
 os.environ["TOGETHER_API_KEY"] = TOGETHER_API_KEY
 
+# One keep-alive connection pool for all Together requests, so TLS handshakes are amortized
+_TOGETHER_SESSION = requests.Session()
+_TOGETHER_SESSION.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=32))
+_TOGETHER_SESSION.mount("http://", HTTPAdapter(pool_connections=32, pool_maxsize=32))
+
+
+class PooledTogether(Together):
+    """
+    Together completion LLM that posts through the shared requests.Session
+    instead of opening a new connection per call.
+    """
+    def _call(self, prompt: str, stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> str:
+        headers = {
+            "Authorization": f"Bearer {self.together_api_key.get_secret_value()}",
+            "Content-Type": "application/json"
+        }
+        stop_to_use = stop[0] if stop and len(stop) == 1 else stop
+        payload = {**self.default_params, "prompt": prompt, "stop": stop_to_use, **kwargs}
+        payload = {k: v for k, v in payload.items() if v is not None}
+
+        response = _TOGETHER_SESSION.post(self.base_url, json=payload, headers=headers, timeout=60)
+        if response.status_code >= 500:
+            raise Exception(f"Together Server: Error {response.status_code}")
+        elif response.status_code >= 400:
+            # Raised as ValueError so safe_invoke retries (covers 429 rate limiting)
+            raise ValueError(f"Together received an invalid payload: {response.text}")
+        elif response.status_code != 200:
+            raise Exception(f"Together returned an unexpected response with status {response.status_code}: {response.text}")
+
+        return self._format_output(response.json())
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: allows bursts up to `capacity` requests and a
+    sustained `rate_per_sec`, blocking only when the bucket is empty.
+    """
+    def __init__(self, rate_per_sec: float, capacity: int):
+        if not rate_per_sec > 0:
+            raise ValueError(f"TokenBucket rate must be > 0 requests/second, got {rate_per_sec}")
+        self.rate = rate_per_sec
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+# Together API rate limit for the whole deployment (the provider limits per API key).
+# Each worker process gets an equal share, so the total stays within TOGETHER_RPS.
+TOGETHER_RPS = float(os.getenv("TOGETHER_RPS", "2"))
+if not TOGETHER_RPS > 0:
+    raise ValueError(f"TOGETHER_RPS must be a positive number of requests per second, got {TOGETHER_RPS}")
+TOGETHER_BURST = 4
+_PROCESS_COUNT = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+_TOGETHER_RATE = TokenBucket(
+    rate_per_sec=TOGETHER_RPS / _PROCESS_COUNT,
+    capacity=max(1, TOGETHER_BURST // _PROCESS_COUNT)
+)
+
+# Persist LLM responses across process restarts (LangChain global cache)
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".llm_cache.db")
+set_llm_cache(SQLiteCache(database_path=LLM_CACHE_PATH))
+
+# In-process exact-match cache of LLM responses, keyed by model settings + prompt
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "4096"))
+_LLM_CACHE: "OrderedDict[str, str]" = OrderedDict()
+_LLM_CACHE_LOCK = threading.Lock()
+
+
+def _llm_cache_key(llm, prompt: str) -> str:
+    raw = f"{getattr(llm, 'model', '')}|{getattr(llm, 'temperature', '')}|{getattr(llm, 'max_tokens', '')}|{prompt}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
 @retry(
     wait=wait_exponential(multiplier=1, min=2, max=30),
     stop=stop_after_attempt(5),
     retry=retry_if_exception_type(ValueError)
 )
 def safe_invoke(llm, prompt: str):
-    return llm.invoke(prompt)
+    key = _llm_cache_key(llm, prompt)
+    with _LLM_CACHE_LOCK:
+        if key in _LLM_CACHE:
+            _LLM_CACHE.move_to_end(key)
+            return _LLM_CACHE[key]
+
+    _TOGETHER_RATE.acquire()
+    response = llm.invoke(prompt)
+
+    with _LLM_CACHE_LOCK:
+        _LLM_CACHE[key] = response
+        _LLM_CACHE.move_to_end(key)
+        if len(_LLM_CACHE) > LLM_CACHE_SIZE:
+            _LLM_CACHE.popitem(last=False)
+    return response
+
+
+def _iter_json_candidates(text: str, opener: str = "{"):
+    """
+    Yield balanced JSON object (or array, with opener "[") substrings of text in
+    order of appearance, skipping brackets inside string literals.
+    """
+    closer = "}" if opener == "{" else "]"
+    start = text.find(opener)
+    while start != -1:
+        depth = 0
+        in_string = False
+        escaped = False
+        end = -1
+        for i in range(start, len(text)):
+            c = text[i]
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif c == "\\":
+                    escaped = True
+                elif c == '"':
+                    in_string = False
+            elif c == '"':
+                in_string = True
+            elif c == opener:
+                depth += 1
+            elif c == closer:
+                depth -= 1
+                if depth == 0:
+                    end = i
+                    break
+        # An unbalanced opener (e.g. a stray brace in prose) just moves on to the next one
+        if end != -1:
+            yield text[start:end + 1]
+        start = text.find(opener, start + 1)
+
+
+def _extract_json(text: str, opener: str = "{", validate=None):
+    """
+    Return the first balanced JSON value in text that parses (and, if given,
+    satisfies validate), or None.
+    """
+    for candidate in _iter_json_candidates(text, opener):
+        try:
+            parsed = orjson.loads(candidate)
+        except orjson.JSONDecodeError:
+            continue
+        if validate is None or validate(parsed):
+            return parsed
+    return None
+
+# Violation rules in priority order: (keywords, severity, category)
+_VIOLATION_RULES = (
+    (("riba",), "high", "riba"),
+    (("gharar", "uncertainty"), "medium", "gharar"),
+    (("haram activity", "prohibited sector"), "low", "haram activities"),
+    (("maysir",), "low", "maysir"),
+    (("minor issue", "technicality"), "low", "other"),
+)
+
+
+# All rule keywords compiled into one automaton; the payload is the rule's priority
+_VIOLATION_AUTOMATON = ahocorasick.Automaton()
+for _priority, (_keywords, _, _) in enumerate(_VIOLATION_RULES):
+    for _keyword in _keywords:
+        _VIOLATION_AUTOMATON.add_word(_keyword, _priority)
+_VIOLATION_AUTOMATON.make_automaton()
+
+
+def _match_violation_rule(reason_text: str):
+    """Return (severity, category) of the highest-priority rule matched in a single scan."""
+    best = None
+    for _, priority in _VIOLATION_AUTOMATON.iter(reason_text.lower()):
+        if best is None or priority < best:
+            best = priority
+            if best == 0:
+                break
+    if best is None:
+        return "low", "other"
+    _, severity, category = _VIOLATION_RULES[best]
+    return severity, category
+
+
+# Representative queries run at startup so the first real audit doesn't pay warm-up costs
+WARMUP_QUERIES = ("riba interest", "gharar uncertainty", "murabaha markup", "sukuk bond", "late payment penalty")
+
+# Cheap pre-filter: product texts that mention none of these are treated as compliant without an LLM call
+SUSPECT_RE = re.compile(
+    r"\b(interest|riba|usury|gharar|uncertain\w*|penalt(?:y|ies)|late\s+(?:payment|fee)s?|fines?"
+    r"|bonds?|gambl\w*|maysir|lottery|speculat\w*|conventional|insurance|derivatives?|options?|futures"
+    r"|alcohol|pork|tobacco|casino|weapons?)\b",
+    re.IGNORECASE
+)
+
+# Text splitting settings for the standards corpus, measured in embedding-model tokens.
+# Chunks default to the model's input window so no text is truncated at embedding time.
+CHUNK_SIZE = int(os.getenv("CHUNK_SIZE_TOKENS", "0")) or None
+CHUNK_OVERLAP = 24
+MIN_CHUNK_CHARS = 40
+
+# Page furniture (running headers, page numbers, TOC headings) stripped before splitting
+_BOILERPLATE_RE = re.compile(
+    r"^\s*(?:Table of Contents|Contents|Page \d+(?: of \d+)?|\d{1,4}|©.*AAOIFI.*)\s*$",
+    re.IGNORECASE | re.MULTILINE
+)
+
+# Embedding model settings
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+# Dynamically quantize the model's Linear layers to int8 when running on CPU
+EMBEDDING_INT8 = os.getenv("EMBEDDING_INT8", "true").lower() == "true"
+
+# On-disk cache of corpus chunk embeddings, kept across index rebuilds
+EMBEDDING_CACHE_FILE = "embedding_cache.sqlite3"
+
+# Written next to the persisted Chroma DB; holds the fingerprint of the corpus it was built from
+CORPUS_SENTINEL = "corpus.sha256"
+
+# Lock file in the PDF folder serializing index checks/rebuilds across worker processes
+INDEX_LOCK_FILE = ".chroma_db.lock"
+
+# Minimum cosine similarity for a semantic cache hit; kept high because a hit reuses a compliance verdict
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.96"))
+
+# Negation cues; "interest is charged" and "no interest is charged" embed close together,
+# so semantic cache hits also require the same cues
+_NEGATION_RE = re.compile(r"\b(?:no|not|non|never|none|nor|neither|without|cannot)\b|n't\b", re.IGNORECASE)
+
+
+def _negation_signature(text: str) -> str:
+    return " ".join(sorted(m.group(0).lower() for m in _NEGATION_RE.finditer(text)))
+
+
+def _build_embedding_model() -> HuggingFaceEmbeddings:
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    embeddings = HuggingFaceEmbeddings(
+        model_name=EMBEDDING_MODEL,
+        model_kwargs={"device": device},
+        encode_kwargs={"batch_size": EMBEDDING_BATCH_SIZE, "normalize_embeddings": True}
+    )
+    if device == "cpu" and EMBEDDING_INT8:
+        embeddings.client = torch.quantization.quantize_dynamic(
+            embeddings.client, {torch.nn.Linear}, dtype=torch.qint8
+        )
+    return embeddings
+
+
+def _embedding_namespace(embeddings: HuggingFaceEmbeddings) -> str:
+    """Identify the settings that determine the vectors an embedding model produces."""
+    device = getattr(embeddings, "model_kwargs", {}).get("device", "cpu")
+    normalize = getattr(embeddings, "encode_kwargs", {}).get("normalize_embeddings", False)
+    quantized = device == "cpu" and EMBEDDING_INT8
+    return f"{getattr(embeddings, 'model_name', '')}|normalize={normalize}|int8={quantized}"
+
+
+class SQLiteCachedEmbeddings(Embeddings):
+    """
+    Wraps an embedding model and stores document embeddings in SQLite keyed by
+    sha256(namespace + text), so unchanged chunks are not re-embedded on rebuild.
+    """
+    def __init__(self, underlying: Embeddings, path: str, namespace: str):
+        self.underlying = underlying
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB)")
+        self._conn.commit()
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.namespace}|{text}".encode("utf-8")).hexdigest()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [self._key(text) for text in texts]
+        cached: Dict[str, List[float]] = {}
+        with self._lock:
+            for i in range(0, len(keys), 500):
+                batch = keys[i:i + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(batch))})", batch
+                ).fetchall()
+                cached.update((key, np.frombuffer(blob, dtype=np.float32).tolist()) for key, blob in rows)
+
+        missing = [i for i, key in enumerate(keys) if key not in cached]
+        if missing:
+            vectors = self.underlying.embed_documents([texts[i] for i in missing])
+            with self._lock:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                    [(keys[i], np.asarray(v, dtype=np.float32).tobytes()) for i, v in zip(missing, vectors)]
+                )
+                self._conn.commit()
+            cached.update((keys[i], list(v)) for i, v in zip(missing, vectors))
+
+        print(f"🧮 Embedded {len(missing)} new chunks ({len(texts) - len(missing)} from cache)")
+        return [cached[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.underlying.embed_query(text)
+
+
+def _load_pdf(file: str) -> List[Document]:
+    """Extract one Document per page using PDFium's native text extraction."""
+    source = os.path.basename(file)
+    pdf = pdfium.PdfDocument(file)
+    try:
+        docs = []
+        for i in range(len(pdf)):
+            page = pdf[i]
+            textpage = page.get_textpage()
+            docs.append(Document(page_content=textpage.get_text_range(), metadata={"source": source, "page": i}))
+            textpage.close()
+            page.close()
+        return docs
+    finally:
+        pdf.close()
+
+
+class SemanticCache:
+    """
+    Embedding-similarity cache for near-duplicate inputs (e.g. paraphrased clauses).
+    Returns a stored response when the cosine similarity to a previous input
+    reaches the threshold and both inputs carry the same negation cues.
+    """
+    def __init__(self, embedding_model, threshold: float = 0.96, maxsize: int = 2048):
+        self.embedding_model = embedding_model
+        self.threshold = threshold
+        self.maxsize = maxsize
+        self.embeddings: Optional[np.ndarray] = None
+        self.signatures: List[str] = []
+        self.responses: List[Any] = []
+        self._lock = threading.Lock()
+
+    def _embed(self, text: str) -> np.ndarray:
+        vector = np.asarray(self.embedding_model.embed_query(text), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def get(self, text: str):
+        """Return (embedding, cached response or None) for the given text."""
+        query = self._embed(text)
+        signature = _negation_signature(text)
+        with self._lock:
+            if self.embeddings is None or not self.responses:
+                return query, None
+            sims = self.embeddings @ query
+            sims[np.asarray(self.signatures) != signature] = -np.inf
+            best = int(sims.argmax())
+            if sims[best] >= self.threshold:
+                return query, self.responses[best]
+        return query, None
+
+    def put(self, text: str, embedding: np.ndarray, response: Any) -> None:
+        with self._lock:
+            row = embedding[np.newaxis, :]
+            self.embeddings = row if self.embeddings is None else np.vstack([self.embeddings, row])
+            self.signatures.append(_negation_signature(text))
+            self.responses.append(response)
+            if len(self.responses) > self.maxsize:
+                self.embeddings = self.embeddings[1:]
+                self.signatures.pop(0)
+                self.responses.pop(0)
+
 
 class ShariahAuditAssistant:
     def __init__(self, pdf_folder: str):
         self.pdf_folder = pdf_folder
-        self.llm = Together(
+        self.llm = PooledTogether(
             model="mistralai/Mixtral-8x7B-Instruct-v0.1",
             temperature=0.0,
             max_tokens=1024,
             together_api_key=TOGETHER_API_KEY
         )
+        self.embedding_model = _build_embedding_model()
+        os.makedirs(self.pdf_folder, exist_ok=True)
+        self.corpus_embeddings = SQLiteCachedEmbeddings(
+            self.embedding_model,
+            os.path.join(self.pdf_folder, EMBEDDING_CACHE_FILE),
+            _embedding_namespace(self.embedding_model)
+        )
         self.vector_db = self._create_vector_db()
+        self._build_source_index()
+        self._warm_up()
+        # Clause-level cache so paraphrased clauses reuse earlier compliance verdicts
+        self.compliance_cache = SemanticCache(self.embedding_model, threshold=SEMANTIC_CACHE_THRESHOLD)
+
+    def _chunk_size(self) -> int:
+        # The splitter counts tokens without [CLS]/[SEP], so leave room for them in the window
+        model = self.embedding_model.client
+        return CHUNK_SIZE or model.max_seq_length - model.tokenizer.num_special_tokens_to_add()
+
+    def _corpus_fingerprint(self, pdf_files: List[str]) -> str:
+        """
+        Hash the PDF folder contents (name, mtime, size) together with the
+        splitting and embedding settings that shape the index.
+        """
+        entries = sorted(
+            (os.path.basename(f), int(os.path.getmtime(f)), os.path.getsize(f)) for f in pdf_files
+        )
+        settings = ("pdfium", self._chunk_size(), CHUNK_OVERLAP, MIN_CHUNK_CHARS, _embedding_namespace(self.embedding_model))
+        return hashlib.sha256(repr((entries, settings)).encode("utf-8")).hexdigest()
 
     def _create_vector_db(self) -> Chroma:
+        """
+        Open the persisted vector database, rebuilding it if needed. Every worker
+        process shares the same directory and embedding cache, so the check and
+        rebuild run under an exclusive file lock: the first worker builds the
+        index while the others wait and then reuse it.
+        """
+        with open(os.path.join(self.pdf_folder, INDEX_LOCK_FILE), "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                return self._load_or_build_vector_db()
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _load_or_build_vector_db(self) -> Chroma:
         pdf_files = [os.path.join(self.pdf_folder, f) for f in os.listdir(self.pdf_folder) if f.endswith('.pdf')]
+        persist_directory = os.path.join(self.pdf_folder, "chroma_db")
+        sentinel_path = os.path.join(persist_directory, CORPUS_SENTINEL)
+        fingerprint = self._corpus_fingerprint(pdf_files)
+
+        # Reuse the persisted database when the corpus has not changed
+        if os.path.isfile(sentinel_path):
+            with open(sentinel_path) as f:
+                if f.read().strip() == fingerprint:
+                    print(f"♻️ Reusing persisted vector database in {persist_directory}")
+                    return Chroma(persist_directory=persist_directory, embedding_function=self.corpus_embeddings)
+
+        # Stale or missing database: start from an empty directory so chunks aren't duplicated
+        shutil.rmtree(persist_directory, ignore_errors=True)
         all_docs = []
 
-        for file in pdf_files:
-            try:
-                loader = PyPDFLoader(file)
-                docs = loader.load()
-                for doc in docs:
-                    doc.metadata['source'] = os.path.basename(file)
-                all_docs.extend(docs)
-                print(f"✅ Loaded {len(docs)} pages from {os.path.basename(file)}")
-            except Exception as e:
-                print(f"❌ Error loading {file}: {e}")
+        # PDFs are parsed independently, so load them concurrently (PDFium is not
+        # thread-safe, hence processes rather than threads). Workers are spawned,
+        # not forked: this runs in a threaded server process with torch loaded.
+        with ProcessPoolExecutor(
+            max_workers=min(len(pdf_files), os.cpu_count() or 1) or 1,
+            mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            futures = [(file, executor.submit(_load_pdf, file)) for file in pdf_files]
+            for file, future in futures:
+                try:
+                    docs = future.result()
+                    all_docs.extend(docs)
+                    print(f"✅ Loaded {len(docs)} pages from {os.path.basename(file)}")
+                except Exception as e:
+                    print(f"❌ Error loading {file}: {e}")
 
         # If no PDFs are found or loaded, create a minimal document set
         if not all_docs:
             print("⚠️ No PDF documents found. Creating a minimal default database.")
-            from langchain_core.documents import Document
             # Create basic Shariah finance principles document
             all_docs = [
                 Document(
@@ -80,41 +518,115 @@ class ShariahAuditAssistant:
                 )
             ]
 
-        splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=150)
-        chunks = splitter.split_documents(all_docs)
+        for doc in all_docs:
+            doc.page_content = _BOILERPLATE_RE.sub("", doc.page_content)
+
+        splitter = RecursiveCharacterTextSplitter.from_huggingface_tokenizer(
+            self.embedding_model.client.tokenizer,
+            chunk_size=self._chunk_size(),
+            chunk_overlap=CHUNK_OVERLAP
+        )
+        chunks = [
+            chunk for chunk in splitter.split_documents(all_docs)
+            if len(chunk.page_content.strip()) >= MIN_CHUNK_CHARS
+        ]
         print(f"📄 Created {len(chunks)} text chunks")
 
-        embedding_model = HuggingFaceEmbeddings()
         # Create a folder for the Chroma database
-        persist_directory = os.path.join(self.pdf_folder, "chroma_db")
         os.makedirs(persist_directory, exist_ok=True)
         
         # Use Chroma instead of FAISS
-        return Chroma.from_documents(
+        vector_db = Chroma.from_documents(
             chunks, 
-            embedding_model,
+            self.corpus_embeddings,
             persist_directory=persist_directory
         )
+        with open(sentinel_path, "w") as f:
+            f.write(fingerprint)
+        return vector_db
 
-    def _safe_parse_json(self, text: str) -> Dict[str, Any]:
-        candidates = re.findall(r'```(?:json)?\s*([\s\S]*?)```', text) + re.findall(r'(\{[\s\S]*\})', text)
-        for match in candidates:
-            try:
-                return json.loads(match.strip())
-            except json.JSONDecodeError:
-                continue
+    def _build_source_index(self) -> None:
+        """
+        Load all chunk embeddings into a normalized matrix so source lookups are a
+        single matrix-vector product instead of a Chroma query.
+        """
+        self._chunk_embeddings = np.empty((0, 0), dtype=np.float32)
+        self._chunk_meta: List[Dict[str, Any]] = []
+        try:
+            data = self.vector_db._collection.get(include=["embeddings", "documents", "metadatas"])
+        except Exception as e:
+            print(f"⚠️ Could not load chunk embeddings, falling back to Chroma search: {e}")
+            return
+
+        embeddings = data.get("embeddings")
+        if embeddings is None or len(embeddings) == 0:
+            return
+
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        self._chunk_embeddings = matrix / norms
+        self._chunk_meta = [
+            {
+                "source_doc": (meta or {}).get("source", "unknown"),
+                "source_text": (doc or "")[:300]
+            }
+            for doc, meta in zip(data["documents"], data["metadatas"])
+        ]
+        print(f"📐 Indexed {len(self._chunk_meta)} chunk embeddings for source lookup")
 
+    def _warm_up(self) -> None:
+        """
+        Load the embedding model kernels and the Chroma/HNSW index into memory by
+        running a few representative queries.
+        """
+        start = time.perf_counter()
         try:
+            for query in WARMUP_QUERIES:
+                self.embedding_model.embed_query(query)
+                self.vector_db.similarity_search(query, k=4)
+        except Exception as e:
+            print(f"⚠️ Warm-up failed: {e}")
+            return
+        print(f"🔥 Warmed up embedding model and vector index in {time.perf_counter() - start:.2f}s")
+
+    def _safe_parse_json(self, text: str) -> Dict[str, Any]:
+        parsed = _extract_json(text)
+        if parsed is None:
+            # Retry with Python-style literals converted to JSON
             fixed_text = text.replace("'", '"').replace("True", "true").replace("False", "false")
-            match = re.search(r'(\{[\s\S]*\})', fixed_text)
-            if match:
-                return json.loads(match.group(0))
-        except Exception:
-            pass
+            parsed = _extract_json(fixed_text)
+        if isinstance(parsed, dict):
+            return parsed
 
         print(f"❌ JSON parsing failed for: {text[:300]}...")
         return {}
 
+    def _safe_parse_json_array(self, text: str, validate=None) -> List[Any]:
+        """
+        Parse the first JSON array in text whose elements pass validate (applied
+        per element), so a short preamble array isn't mistaken for the answer.
+        """
+        parsed = _extract_json(
+            text, "[",
+            None if validate is None else lambda value: isinstance(value, list) and all(map(validate, value))
+        )
+        if isinstance(parsed, list):
+            return parsed
+
+        print(f"❌ JSON array parsing failed for: {text[:300]}...")
+        return []
+
+    def _empty_structured_data(self) -> Dict[str, Any]:
+        return {
+            "product_type": None,
+            "main_parties": [],
+            "contract_type": None,
+            "key_clauses": [],
+            "financial_terms": [],
+            "suspicious_terms": []
+        }
+
     def extract_structured_data(self, text: str) -> Dict[str, Any]:
         prompt = f"""
         You are a Shariah compliance assistant. Analyze the following Islamic finance product description and extract structured information. Return only a JSON object with the following fields:
@@ -131,17 +643,9 @@ class ShariahAuditAssistant:
 
         Return a valid JSON. Do not include explanations.
         """
-        response = self.llm.invoke(prompt)
+        response = safe_invoke(self.llm, prompt)
         print(f"🔍 Raw extraction response:\n{response[:300]}...")
-        default = {
-            "product_type": None,
-            "main_parties": [],
-            "contract_type": None,
-            "key_clauses": [],
-            "financial_terms": [],
-            "suspicious_terms": []
-        }
-        return {**default, **self._safe_parse_json(response)}
+        return {**self._empty_structured_data(), **self._safe_parse_json(response)}
 
     def check_clause_compliance(self, clause: str) -> dict:
         prompt = f"""
@@ -156,18 +660,100 @@ class ShariahAuditAssistant:
         Clause: "{clause}"
         Only return valid JSON.
         """
+        embedding, cached = self.compliance_cache.get(clause)
+        if cached is not None:
+            return {**cached, "clause": clause}
+
         response = safe_invoke(self.llm, prompt)
         print(f"🧾 Raw compliance check response:\n{response[:300]}...")
-        try:
-            return json.loads(response)
-        except json.JSONDecodeError:
+        result = _extract_json(response)
+        if isinstance(result, dict):
+            self.compliance_cache.put(clause, embedding, result)
+            return {**result, "clause": clause}
+        else:
             return {
                 "clause": clause,
                 "compliant": False,
                 "reason": "Failed to parse compliance data"
             }
 
-    def find_source_for_clause(self, clause: str) -> Optional[Dict[str, Any]]:
+    def check_clauses_compliance_batch(self, clauses: List[str]) -> List[Dict[str, Any]]:
+        """
+        Check several clauses with a single LLM request. Clauses answered by the
+        semantic cache are skipped; if the batched answer cannot be matched back
+        to the clauses, each remaining clause is checked individually.
+        """
+        return self._check_clauses_compliance_batch(clauses)[0]
+
+    def _check_clauses_compliance_batch(self, clauses: List[str]):
+        """
+        check_clauses_compliance_batch, also returning the clause embeddings
+        computed for the cache lookup so callers can reuse them.
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(clauses)
+        embeddings = []
+        pending = []
+        for i, clause in enumerate(clauses):
+            embedding, cached = self.compliance_cache.get(clause)
+            embeddings.append(embedding)
+            if cached is not None:
+                results[i] = {**cached, "clause": clause}
+            else:
+                pending.append((i, clause, embedding))
+
+        if pending:
+            numbered = "\n".join(f"{n}) \"{clause}\"" for n, (_, clause, _) in enumerate(pending, 1))
+            prompt = f"""
+        You are a Shariah compliance expert. Assess each of the following clauses from an Islamic finance product and decide whether it may violate Shariah principles. Return a JSON array where element i is the verdict for clause i, using this structure:
+
+        [
+          {{
+            "clause": "...",
+            "compliant": true/false,
+            "reason": "..."
+          }}
+        ]
+
+        Clauses:
+        {numbered}
+
+        Only return a valid JSON array with exactly {len(pending)} elements.
+        """
+            response = safe_invoke(self.llm, prompt)
+            print(f"🧾 Raw batch compliance response:\n{response[:300]}...")
+            verdicts = self._safe_parse_json_array(response, lambda v: isinstance(v, dict) and "compliant" in v)
+
+            if len(verdicts) == len(pending):
+                for (i, clause, embedding), verdict in zip(pending, verdicts):
+                    self.compliance_cache.put(clause, embedding, verdict)
+                    results[i] = {**verdict, "clause": clause}
+            else:
+                print("⚠️ Batch compliance response did not match the clauses; checking individually.")
+                for i, clause, _ in pending:
+                    results[i] = self.check_clause_compliance(clause)
+
+        return results, embeddings
+
+    def find_source_for_clause(self, clause: str, embedding: Optional[np.ndarray] = None) -> Optional[Dict[str, Any]]:
+        """
+        Return the corpus chunk closest to the clause. Pass the clause's normalized
+        embedding (e.g. from the compliance cache lookup) to avoid embedding it again.
+        """
+        if self._chunk_meta:
+            try:
+                if embedding is not None:
+                    query = embedding
+                else:
+                    query = np.asarray(self.embedding_model.embed_query(clause), dtype=np.float32)
+                    norm = np.linalg.norm(query)
+                    if norm:
+                        query /= norm
+                idx = int((self._chunk_embeddings @ query).argmax())
+                return dict(self._chunk_meta[idx])
+            except Exception as e:
+                print(f"❌ Failed to find source: {e}")
+                return None
+
         try:
             results = self.vector_db.similarity_search(clause, k=1)
             if results:
@@ -190,49 +776,87 @@ class ShariahAuditAssistant:
         """
         return safe_invoke(self.llm, prompt).strip()
 
+    def suggest_improvements_batch(self, clauses: List[str]) -> List[str]:
+        """
+        Suggest Shariah-compliant alternatives for several clauses with a single LLM request.
+        """
+        if not clauses:
+            return []
+
+        numbered = "\n".join(f"{n}) \"{clause}\"" for n, clause in enumerate(clauses, 1))
+        prompt = f"""
+        The following clauses in an Islamic finance contract have been flagged as non-compliant:
+
+        {numbered}
+
+        For each clause, suggest a Shariah-compliant alternative or modification to make it acceptable.
+        Return a JSON array of {len(clauses)} strings where element i is the suggestion for clause i.
+        """
+        response = safe_invoke(self.llm, prompt)
+        suggestions = self._safe_parse_json_array(response, lambda s: isinstance(s, str))
+        if len(suggestions) == len(clauses):
+            return [s.strip() for s in suggestions]
+
+        print("⚠️ Batch suggestion response did not match the clauses; suggesting individually.")
+        return [self.suggest_improvement(clause) for clause in clauses]
+
     def classify_severity(self, reason_text: str) -> str:
-        reason = reason_text.lower()
-        if "riba" in reason:
-            return "high"
-        elif "gharar" in reason or "uncertainty" in reason:
-            return "medium"
-        elif "minor issue" in reason or "technicality" in reason:
-            return "low"
-        return "low"
+        return _match_violation_rule(reason_text)[0]
 
     def classify_violation_category(self, reason_text: str) -> str:
-        reason = reason_text.lower()
-        if "riba" in reason:
-            return "riba"
-        elif "gharar" in reason or "uncertainty" in reason:
-            return "gharar"
-        elif "haram activity" in reason or "prohibited sector" in reason:
-            return "haram activities"
-        elif "maysir" in reason:
-            return "maysir"
-        return "other"
+        return _match_violation_rule(reason_text)[1]
+
+    def iter_audit_product_description(self, text: str) -> Iterator[Dict[str, Any]]:
+        """
+        Audit a product description, yielding events as results become available:
+        {"type": "product_summary", "data": ...}, then one {"type": "clause", "index": i, "data": ...}
+        per suspicious clause (compliant clauses first, violations once their fixes are ready),
+        and finally {"type": "done", "data": {"overall_compliance": ...}}.
+        """
+        # Fast path: no known Shariah red-flag terms, so skip the LLM round-trips entirely
+        if SUSPECT_RE.search(text) is None:
+            yield {"type": "product_summary", "data": self._empty_structured_data()}
+            yield {"type": "done", "data": {"overall_compliance": True}}
+            return
 
-    def audit_product_description(self, text: str) -> dict:
         structured_data = self.extract_structured_data(text)
+        yield {"type": "product_summary", "data": structured_data}
         suspicious_terms = structured_data.get("suspicious_terms", [])
 
-        audit_results = []
-        for clause in suspicious_terms:
-            result = self.check_clause_compliance(clause)
-            source_info = self.find_source_for_clause(clause)
+        audit_results, embeddings = self._check_clauses_compliance_batch(suspicious_terms)
+        violation_indices = []
+        for i, (clause, result) in enumerate(zip(suspicious_terms, audit_results)):
+            source_info = self.find_source_for_clause(clause, embeddings[i])
             if source_info:
                 result.update(source_info)
+            if result["compliant"]:
+                yield {"type": "clause", "index": i, "data": result}
+            else:
+                violation_indices.append(i)
 
-            if not result["compliant"]:
-                result["severity"] = self.classify_severity(result["reason"])
-                result["category"] = self.classify_violation_category(result["reason"])
-                result["suggested_fix"] = self.suggest_improvement(clause)
+        fixes = self.suggest_improvements_batch([audit_results[i]["clause"] for i in violation_indices])
+        for i, fix in zip(violation_indices, fixes):
+            result = audit_results[i]
+            result["severity"], result["category"] = _match_violation_rule(result["reason"])
+            result["suggested_fix"] = fix
+            yield {"type": "clause", "index": i, "data": result}
 
-            audit_results.append(result)
-            time.sleep(1.1)  # API rate limit
+        yield {"type": "done", "data": {"overall_compliance": not violation_indices}}
 
+    def audit_product_description(self, text: str) -> dict:
+        structured_data: Dict[str, Any] = {}
+        clauses: Dict[int, Dict[str, Any]] = {}
+        overall_ok = True
+        for event in self.iter_audit_product_description(text):
+            if event["type"] == "product_summary":
+                structured_data = event["data"]
+            elif event["type"] == "clause":
+                clauses[event["index"]] = event["data"]
+            elif event["type"] == "done":
+                overall_ok = event["data"]["overall_compliance"]
+
+        audit_results = [clauses[i] for i in sorted(clauses)]
         violations = [r for r in audit_results if not r["compliant"]]
-        overall_ok = all(r["compliant"] for r in audit_results)
 
         return {
             "product_summary": structured_data,
@@ -1,15 +1,34 @@
-import pandas as pd
 import numpy as np
 from datetime import datetime
 import os
+import io
+import time
 import json
-from fpdf import FPDF
+import asyncio
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+import diskcache
+import functools
+import ahocorasick
+import httpx
+from xml.sax.saxutils import escape
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.units import mm
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
 import streamlit as st
 from langchain.chat_models import ChatOpenAI
 from langchain.schema import HumanMessage, SystemMessage
+from tenacity import retry, stop_after_attempt, wait_exponential
 import warnings
 warnings.filterwarnings('ignore')
 
+# Optional JIT for the aggregation kernel; falls back to np.bincount without numba
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
 # Define AAOIFI standards for Zakat calculation
 AAOIFI_STANDARDS = {
     "FAS_9": {
@@ -17,101 +36,217 @@ AAOIFI_STANDARDS = {
         "nisab_gold": 85,  # grams of gold
         "nisab_silver": 595,  # grams of silver
         "rate": 0.025,  # 2.5%
-        "zakatable_assets": [
+        "zakatable_assets": (
             "Cash and cash equivalents",
             "Trade receivables",
             "Inventory",
             "Investments (short-term)",
             "Gold and silver",
             "Agricultural produce"
-        ],
-        "non_zakatable_assets": [
+        ),
+        "non_zakatable_assets": (
             "Fixed assets",
             "Intangible assets",
             "Long-term investments for operations",
             "Properties for personal use"
-        ],
-        "deductible_liabilities": [
+        ),
+        "deductible_liabilities": (
             "Short-term liabilities",
             "Operational expenses due",
             "Taxes payable"
-        ],
-        "non_deductible_liabilities": [
+        ),
+        "non_deductible_liabilities": (
             "Long-term debts",
             "Capital investments"
-        ]
+        )
     }
 }
 
-# Current gold and silver prices (these would normally be fetched via API)
+# Current gold and silver prices (fallback when no price feed is configured)
 METAL_PRICES = {
     "gold_per_gram": 70,  # USD
     "silver_per_gram": 0.85  # USD
 }
+# Optional JSON feed returning {"gold_per_gram": ..., "silver_per_gram": ...} in USD
+METAL_PRICES_URL = os.getenv("ZAKAT_METAL_PRICES_URL")
+METAL_PRICES_TTL = 3600
+
+
+@functools.lru_cache(maxsize=1)
+def _fetch_metal_prices(window):
+    """
+    Metal prices for one TTL window; the window argument only serves to expire the cache
+    """
+    if not METAL_PRICES_URL:
+        return METAL_PRICES
+    try:
+        response = httpx.get(METAL_PRICES_URL, timeout=10)
+        response.raise_for_status()
+        data = response.json()
+        return {key: float(data[key]) for key in METAL_PRICES}
+    except (httpx.HTTPError, ValueError, KeyError, TypeError) as e:
+        print(f"⚠️ Metal price feed unavailable, using fallback prices: {str(e)}")
+        return METAL_PRICES
+
+
+def get_metal_prices():
+    """
+    Single entry point for metal prices, fetched at most once per METAL_PRICES_TTL
+    """
+    return _fetch_metal_prices(int(time.time() // METAL_PRICES_TTL))
+
+
+@functools.lru_cache(maxsize=2048)
+def _money(value):
+    """Format an amount as dollars; cached since the same totals repeat across views and documents"""
+    return f"${value:,.2f}"
+
+
+# Lowercase account-name keywords for each classification bucket
+ZAKATABLE_KW = frozenset({"cash", "bank", "receivable", "inventory", "investment", "gold", "silver"})
+NON_ZAKATABLE_KW = frozenset({"property", "equipment", "building", "intangible", "goodwill"})
+DEDUCTIBLE_KW = frozenset({"payable", "accrued", "tax", "short term"})
+NON_DEDUCTIBLE_KW = frozenset({"loan", "long term", "capital"})
+
+# Keyword rules for classifying balance sheet accounts, in priority order:
+# an account goes to the first bucket with any keyword in its name
+# (simple keyword matching, would be more sophisticated in production)
+_KEYWORDS = {
+    "zakatable_assets": ZAKATABLE_KW,
+    "non_zakatable_assets": NON_ZAKATABLE_KW,
+    "deductible_liabilities": DEDUCTIBLE_KW,
+    "non_deductible_liabilities": NON_DEDUCTIBLE_KW
+}
+BUCKET_NAMES = tuple(_KEYWORDS)
+
+# All rule keywords compiled into one automaton; the payload is the rule's priority
+_ACCOUNT_AUTOMATON = ahocorasick.Automaton()
+for _priority, _keywords in enumerate(_KEYWORDS.values()):
+    for _keyword in _keywords:
+        _ACCOUNT_AUTOMATON.add_word(_keyword, _priority)
+_ACCOUNT_AUTOMATON.make_automaton()
+
+
+# Bucket ids are positions in BUCKET_NAMES; unmatched accounts get the id past the end
+ZAKATABLE_ID, NON_ZAKATABLE_ID, DEDUCTIBLE_ID, NON_DEDUCTIBLE_ID = range(len(BUCKET_NAMES))
+UNCLASSIFIED_ID = len(BUCKET_NAMES)
+
+
+@functools.lru_cache(maxsize=1024)
+def _match_account_bucket(account):
+    """Return the bucket id of the highest-priority rule matched in a single scan."""
+    best = UNCLASSIFIED_ID
+    for _, priority in _ACCOUNT_AUTOMATON.iter(account.lower()):
+        if priority < best:
+            best = priority
+            if best == 0:
+                break
+    return best
+
+
+def _scan_balance_sheet(balance_sheet, include_classification=True):
+    """
+    Single pass over the balance sheet: returns the bucket id and value arrays
+    for aggregation, plus the per-bucket account dicts (None unless requested).
+    """
+    classified = {bucket: {} for bucket in BUCKET_NAMES} if include_classification else None
+    bucket_ids = []
+    values = []
+    for account, value in balance_sheet.items():
+        bucket_id = _match_account_bucket(account)
+        bucket_ids.append(bucket_id)
+        values.append(value)
+        if classified is not None and bucket_id != UNCLASSIFIED_ID:
+            classified[BUCKET_NAMES[bucket_id]][account] = value
+    return np.array(bucket_ids, dtype=np.intp), np.array(values, dtype=np.float64), classified
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _aggregate(values, bucket_ids):
+        """Per-bucket totals in one compiled accumulation loop"""
+        totals = np.zeros(UNCLASSIFIED_ID + 1)
+        for i in range(values.shape[0]):
+            totals[bucket_ids[i]] += values[i]
+        return totals
+else:
+    def _aggregate(values, bucket_ids):
+        """Per-bucket totals (NumPy fallback when numba isn't installed)"""
+        return np.bincount(bucket_ids, weights=values, minlength=UNCLASSIFIED_ID + 1)
+
 
 class ZakatCalculator:
     """
     Core class for calculating Zakat based on AAOIFI standards
     """
     def __init__(self, standard="FAS_9"):
+        self.standard_name = standard
         self.standard = AAOIFI_STANDARDS[standard]
+        prices = get_metal_prices()
         self.nisab_value = max(
-            self.standard["nisab_gold"] * METAL_PRICES["gold_per_gram"],
-            self.standard["nisab_silver"] * METAL_PRICES["silver_per_gram"]
+            self.standard["nisab_gold"] * prices["gold_per_gram"],
+            self.standard["nisab_silver"] * prices["silver_per_gram"]
         )
         self.rate = self.standard["rate"]
+        # Memoized calculations per balance sheet, bound per instance so they
+        # use this calculator's standard and Nisab
+        self._calc = functools.lru_cache(maxsize=64)(self._calculate_from_items)
+
         
     def classify_accounts(self, financial_data):
         """
         Classifies accounts as zakatable, non-zakatable, or deductible
         """
-        classified = {
-            "zakatable_assets": {},
-            "non_zakatable_assets": {},
-            "deductible_liabilities": {},
-            "non_deductible_liabilities": {}
-        }
-        
-        # For each account in balance sheet
-        for account, value in financial_data["balance_sheet"].items():
-            account_lower = account.lower()
-            
-            # Classify using simple keyword matching (would be more sophisticated in production)
-            if any(keyword in account_lower for keyword in ["cash", "bank", "receivable", "inventory", "investment", "gold", "silver"]):
-                classified["zakatable_assets"][account] = value
-            elif any(keyword in account_lower for keyword in ["property", "equipment", "building", "intangible", "goodwill"]):
-                classified["non_zakatable_assets"][account] = value
-            elif any(keyword in account_lower for keyword in ["payable", "accrued", "tax", "short term"]):
-                classified["deductible_liabilities"][account] = value
-            elif any(keyword in account_lower for keyword in ["loan", "long term", "capital"]):
-                classified["non_deductible_liabilities"][account] = value
-        
+        _, _, classified = _scan_balance_sheet(financial_data["balance_sheet"])
         return classified
     
-    def calculate_zakat_base(self, financial_data):
+    def calculate_zakat_base(self, financial_data, include_classification=True):
         """
         Calculate Zakat base according to AAOIFI FAS 9
+        
+        Classification, the per-bucket account dicts (only when include_classification
+        is set) and the inputs to the totals all come from one walk of the balance sheet.
         """
-        classified = self.classify_accounts(financial_data)
+        bucket_ids, values, classified = _scan_balance_sheet(financial_data["balance_sheet"], include_classification)
+        totals = _aggregate(values, bucket_ids)
         
         # Net Asset Method (most common in AAOIFI)
-        total_zakatable_assets = sum(classified["zakatable_assets"].values())
-        total_deductible_liabilities = sum(classified["deductible_liabilities"].values())
+        total_zakatable_assets = float(totals[ZAKATABLE_ID])
+        total_deductible_liabilities = float(totals[DEDUCTIBLE_ID])
         
         zakat_base = total_zakatable_assets - total_deductible_liabilities
         
-        return {
-            "classified_accounts": classified,
+        calculation = {
             "total_zakatable_assets": total_zakatable_assets,
             "total_deductible_liabilities": total_deductible_liabilities,
             "zakat_base": zakat_base
         }
+        if classified is not None:
+            calculation["classified_accounts"] = classified
+        return calculation
     
-    def calculate_zakat_amount(self, financial_data):
+    def calculate_zakat_amount(self, financial_data, include_classification=True):
         """
         Calculate final Zakat amount
+        
+        Results are memoized per balance sheet; the calculation date is
+        stamped on each call so it is never served stale.
         """
-        calculation = self.calculate_zakat_base(financial_data)
+        cached = self._calc(tuple(financial_data["balance_sheet"].items()), include_classification)
+        # Copy so callers can't mutate the cached result
+        calculation = dict(cached)
+        if "classified_accounts" in cached:
+            calculation["classified_accounts"] = {
+                bucket: dict(accounts) for bucket, accounts in cached["classified_accounts"].items()
+            }
+        calculation["calculation_date"] = datetime.now().strftime("%Y-%m-%d")
+        return calculation
+    
+    def _calculate_zakat_amount(self, financial_data, include_classification=True):
+        """
+        Uncached Zakat amount calculation, without the calculation date
+        """
+        calculation = self.calculate_zakat_base(financial_data, include_classification)
         zakat_base = calculation["zakat_base"]
         
         # Check if wealth meets Nisab threshold
@@ -127,33 +262,81 @@ class ZakatCalculator:
         # Add additional information
         calculation["nisab_value"] = self.nisab_value
         calculation["zakat_rate"] = self.rate
-        calculation["calculation_date"] = datetime.now().strftime("%Y-%m-%d")
         
         return calculation
+    
+    def _calculate_from_items(self, balance_items, include_classification):
+        """
+        Zakat calculation keyed on the balance sheet's (account, value) pairs, for memoization
+        """
+        return self._calculate_zakat_amount({"balance_sheet": dict(balance_items)}, include_classification)
+
+
+# LLM advice only depends on the calculation summary, so it is cached on disk
+# keyed on these (rounded) fields
+ADVICE_CACHE_DIR = os.getenv("ZAKAT_LLM_CACHE_DIR", "/tmp/zakat_llm")
+ADVICE_CACHE_TTL = 7 * 24 * 3600
+ADVICE_KEY_FIELDS = (
+    "total_zakatable_assets",
+    "total_deductible_liabilities",
+    "zakat_base",
+    "nisab_value",
+    "zakat_amount",
+    "zakat_rate"
+)
+
+
+def _advice_key(kind, calculation_results):
+    """Cache key for one kind of advice ("compliance" or "optimization") on a calculation summary"""
+    return (kind,) + tuple(round(float(calculation_results[field]), 2) for field in ADVICE_KEY_FIELDS)
+
+
+def _valid_batch_advice(advice, count):
+    """
+    Whether a batched reply holds exactly one {"entity": i, "advice": "<non-empty text>"}
+    object per entity, in order (entity numbers start at 1)
+    """
+    return (
+        isinstance(advice, list)
+        and len(advice) == count
+        and all(
+            isinstance(item, dict)
+            and item.get("entity") == i
+            and isinstance(item.get("advice"), str)
+            and item["advice"].strip()
+            for i, item in enumerate(advice, 1)
+        )
+    )
 
 
 class ZakatComplianceAdvisor:
     """
     Uses AI to provide compliance advice and optimization suggestions
     """
-    def __init__(self, api_key=None):
+    def __init__(self, api_key=None, batch_size=8, max_concurrency=4):
         self.api_key = api_key or os.getenv("OPENAI_API_KEY", "dummy_key")
         self.llm = ChatOpenAI(temperature=0, openai_api_key=self.api_key)
+        # Entities per batched prompt, and batched prompts in flight at once
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.cache = diskcache.Cache(ADVICE_CACHE_DIR)
+        # Async chat models per event loop (see _async_llm)
+        self._async_llms = weakref.WeakKeyDictionary()
         
-    def get_compliance_advice(self, financial_data, calculation_results):
+    def _compliance_messages(self, calculation_results):
         """
-        Generate compliance advice based on financial data and calculation results
+        Build the chat messages for the compliance advice prompt
         """
         prompt = f"""
         As an Islamic Finance expert, analyze the following Zakat calculation results and provide
         compliance advice according to AAOIFI FAS 9 standards:
         
         Financial Summary:
-        - Total zakatable assets: ${calculation_results['total_zakatable_assets']:,.2f}
-        - Total deductible liabilities: ${calculation_results['total_deductible_liabilities']:,.2f}
-        - Zakat base: ${calculation_results['zakat_base']:,.2f}
-        - Nisab threshold: ${calculation_results['nisab_value']:,.2f}
-        - Zakat amount due: ${calculation_results['zakat_amount']:,.2f}
+        - Total zakatable assets: {_money(calculation_results['total_zakatable_assets'])}
+        - Total deductible liabilities: {_money(calculation_results['total_deductible_liabilities'])}
+        - Zakat base: {_money(calculation_results['zakat_base'])}
+        - Nisab threshold: {_money(calculation_results['nisab_value'])}
+        - Zakat amount due: {_money(calculation_results['zakat_amount'])}
         
         Please provide:
         1. An assessment of compliance with AAOIFI standards
@@ -164,29 +347,23 @@ class ZakatComplianceAdvisor:
         Keep your response concise and focused on practical advice.
         """
         
-        messages = [
+        return [
             SystemMessage(content="You are an Islamic Finance expert specializing in Zakat compliance according to AAOIFI standards."),
             HumanMessage(content=prompt)
         ]
-        
-        try:
-            response = self.llm(messages)
-            return response.content
-        except Exception as e:
-            return f"Error generating compliance advice: {str(e)}"
     
-    def get_optimization_suggestions(self, financial_data, calculation_results):
+    def _optimization_messages(self, calculation_results):
         """
-        Generate Zakat optimization suggestions within Shariah boundaries
+        Build the chat messages for the optimization suggestions prompt
         """
         prompt = f"""
         As an Islamic Finance expert, provide legitimate Zakat optimization strategies for the following financial situation:
         
         Financial Summary:
-        - Total zakatable assets: ${calculation_results['total_zakatable_assets']:,.2f}
-        - Total deductible liabilities: ${calculation_results['total_deductible_liabilities']:,.2f}
-        - Zakat base: ${calculation_results['zakat_base']:,.2f}
-        - Zakat amount due: ${calculation_results['zakat_amount']:,.2f}
+        - Total zakatable assets: {_money(calculation_results['total_zakatable_assets'])}
+        - Total deductible liabilities: {_money(calculation_results['total_deductible_liabilities'])}
+        - Zakat base: {_money(calculation_results['zakat_base'])}
+        - Zakat amount due: {_money(calculation_results['zakat_amount'])}
         
         Provide 3-5 specific, actionable suggestions for Zakat optimization that:
         1. Comply fully with Shariah principles
@@ -196,177 +373,386 @@ class ZakatComplianceAdvisor:
         For each suggestion, briefly explain how it works and why it's Shariah-compliant.
         """
         
-        messages = [
+        return [
             SystemMessage(content="You are an Islamic Finance expert specializing in Shariah-compliant Zakat optimization."),
             HumanMessage(content=prompt)
         ]
-        
+    
+    def _messages(self, kind, calculation_results):
+        """
+        Build the chat messages for one kind of advice
+        """
+        if kind == "compliance":
+            return self._compliance_messages(calculation_results)
+        return self._optimization_messages(calculation_results)
+    
+    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=1, max=10), reraise=True)
+    def _call(self, messages):
+        """
+        Send one chat request, retrying transient failures
+        """
+        return self.llm.invoke(messages).content
+    
+    def _call_cached(self, kind, calculation_results):
+        """
+        Return cached advice for the calculation summary, calling the LLM only on a miss
+        """
+        key = _advice_key(kind, calculation_results)
+        advice = self.cache.get(key)
+        if advice is None:
+            advice = self._call(self._messages(kind, calculation_results))
+            self.cache.set(key, advice, expire=ADVICE_CACHE_TTL)
+        return advice
+    
+    def get_compliance_advice(self, financial_data, calculation_results):
+        """
+        Generate compliance advice based on financial data and calculation results
+        """
         try:
-            response = self.llm(messages)
-            return response.content
+            return self._call_cached("compliance", calculation_results)
+        except Exception as e:
+            return f"Error generating compliance advice: {str(e)}"
+    
+    def get_optimization_suggestions(self, financial_data, calculation_results):
+        """
+        Generate Zakat optimization suggestions within Shariah boundaries
+        """
+        try:
+            return self._call_cached("optimization", calculation_results)
         except Exception as e:
             return f"Error generating optimization suggestions: {str(e)}"
+    
+    def _async_llm(self):
+        """
+        Chat model for the running event loop; its async HTTP client is bound to
+        the loop it first ran on, so each asyncio.run gets its own instance
+        """
+        loop = asyncio.get_running_loop()
+        llm = self._async_llms.get(loop)
+        if llm is None:
+            llm = ChatOpenAI(temperature=0, openai_api_key=self.api_key)
+            self._async_llms[loop] = llm
+        return llm
+    
+    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=1, max=10), reraise=True)
+    async def _acall(self, messages):
+        """
+        Send one chat request asynchronously, retrying transient failures
+        """
+        response = await self._async_llm().ainvoke(messages)
+        return response.content
+    
+    async def _acall_cached(self, kind, calculation_results):
+        """
+        Async counterpart of _call_cached
+        """
+        key = _advice_key(kind, calculation_results)
+        advice = self.cache.get(key)
+        if advice is None:
+            advice = await self._acall(self._messages(kind, calculation_results))
+            self.cache.set(key, advice, expire=ADVICE_CACHE_TTL)
+        return advice
+    
+    def _batch_compliance_messages(self, calculation_results_list):
+        """
+        Build one prompt covering several entities, asking for a JSON array of advice in order
+        """
+        entities = "\n".join(
+            f"""### Entity {i}
+        - Total zakatable assets: {_money(results['total_zakatable_assets'])}
+        - Total deductible liabilities: {_money(results['total_deductible_liabilities'])}
+        - Zakat base: {_money(results['zakat_base'])}
+        - Nisab threshold: {_money(results['nisab_value'])}
+        - Zakat amount due: {_money(results['zakat_amount'])}
+        """
+            for i, results in enumerate(calculation_results_list, 1)
+        )
+        prompt = f"""
+        As an Islamic Finance expert, analyze the following {len(calculation_results_list)} Zakat calculation
+        results and provide compliance advice for each according to AAOIFI FAS 9 standards:
+        
+        {entities}
+        For each entity, provide:
+        1. An assessment of compliance with AAOIFI standards
+        2. Any potential issues or concerns with the classification of assets/liabilities
+        3. Recommendations for improving Zakat compliance
+        4. Any relevant Shariah considerations
+        
+        Keep each response concise and focused on practical advice.
+        Respond with only a JSON array of {len(calculation_results_list)} objects, in entity order,
+        each shaped like {{"entity": <number>, "advice": "<advice text>"}}.
+        """
+        
+        return [
+            SystemMessage(content="You are an Islamic Finance expert specializing in Zakat compliance according to AAOIFI standards."),
+            HumanMessage(content=prompt)
+        ]
+    
+    async def _compliance_advice_chunk(self, calculation_results_list, semaphore):
+        """
+        Advise one batch of entities with a single request; falls back to one
+        request per entity unless every item of the reply is valid (see _valid_batch_advice)
+        """
+        async with semaphore:
+            try:
+                text = await self._acall(self._batch_compliance_messages(calculation_results_list))
+                advice = json.loads(text[text.index("["):text.rindex("]") + 1])
+                if _valid_batch_advice(advice, len(calculation_results_list)):
+                    advice = [item["advice"].strip() for item in advice]
+                    for results, text in zip(calculation_results_list, advice):
+                        self.cache.set(_advice_key("compliance", results), text, expire=ADVICE_CACHE_TTL)
+                    return advice
+                print("⚠️ Batched compliance advice did not match the entities. Advising entities individually.")
+            except Exception as e:
+                print(f"⚠️ Batched compliance advice failed: {e}. Advising entities individually.")
+            
+            results = await asyncio.gather(
+                *(self._acall_cached("compliance", results) for results in calculation_results_list),
+                return_exceptions=True
+            )
+            return [
+                f"Error generating compliance advice: {str(result)}" if isinstance(result, Exception) else result
+                for result in results
+            ]
+    
+    async def get_compliance_advice_batch_async(self, entries):
+        """
+        Generate compliance advice for many entities, packing `batch_size`
+        entities into each prompt and running up to `max_concurrency` prompts at once
+        
+        Args:
+            entries: List of (financial_data, calculation_results) pairs
+            
+        Returns:
+            List of advice strings, in the same order as entries
+        """
+        advice = [self.cache.get(_advice_key("compliance", results)) for _, results in entries]
+        
+        # Only entities without cached advice go to the LLM
+        missing = [i for i, text in enumerate(advice) if text is None]
+        calculation_results_list = [entries[i][1] for i in missing]
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        chunks = await asyncio.gather(*(
+            self._compliance_advice_chunk(calculation_results_list[start:start + self.batch_size], semaphore)
+            for start in range(0, len(calculation_results_list), self.batch_size)
+        ))
+        for i, text in zip(missing, (text for chunk in chunks for text in chunk)):
+            advice[i] = text
+        return advice
+    
+    def get_compliance_advice_batch(self, entries):
+        """
+        Synchronous wrapper around get_compliance_advice_batch_async
+        """
+        return asyncio.run(self.get_compliance_advice_batch_async(entries))
+    
+    def get_both(self, financial_data, calculation_results):
+        """
+        Request compliance advice and optimization suggestions concurrently on two
+        threads, for callers without an event loop (e.g. Streamlit reruns)
+        
+        Returns:
+            Tuple of (compliance_advice, optimization_suggestions)
+        """
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            compliance = executor.submit(self.get_compliance_advice, financial_data, calculation_results)
+            optimization = executor.submit(self.get_optimization_suggestions, financial_data, calculation_results)
+            return compliance.result(), optimization.result()
+    
+    async def get_both_async(self, financial_data, calculation_results):
+        """
+        Request compliance advice and optimization suggestions concurrently,
+        so the two LLM round trips overlap instead of running back to back
+        
+        Returns:
+            Tuple of (compliance_advice, optimization_suggestions)
+        """
+        compliance, optimization = await asyncio.gather(
+            self._acall_cached("compliance", calculation_results),
+            self._acall_cached("optimization", calculation_results),
+            return_exceptions=True
+        )
+        if isinstance(compliance, Exception):
+            compliance = f"Error generating compliance advice: {str(compliance)}"
+        if isinstance(optimization, Exception):
+            optimization = f"Error generating optimization suggestions: {str(optimization)}"
+        return compliance, optimization
+
+
+# Paragraph styles (fonts, sizes, spacing) resolved once and shared by every document
+_STYLES = getSampleStyleSheet()
+
+# Shared layout for the two-column label/value tables in generated documents
+_TABLE_STYLE = TableStyle([
+    ("FONTNAME", (0, 0), (-1, -1), "Helvetica"),
+    ("FONTSIZE", (0, 0), (-1, -1), 11),
+    ("LEFTPADDING", (0, 0), (-1, -1), 0),
+    ("BOTTOMPADDING", (0, 0), (-1, -1), 3),
+    ("VALIGN", (0, 0), (-1, -1), "TOP")
+])
+# Bolds the last row of a table, used for totals
+_TOTAL_ROW_STYLE = TableStyle([("FONTNAME", (0, -1), (-1, -1), "Helvetica-Bold")])
+
+ENTITY_INFO_TEMPLATE = (
+    "<b>Entity Name:</b> {name}<br/>"
+    "<b>Registration Number:</b> {registration}<br/>"
+    "<b>Zakat Year:</b> {zakat_year}"
+)
+
+
+def document_filename(prefix, entity_info):
+    """Download file name for a generated document, e.g. zakat_certificate_Sample_Business_LLC.pdf"""
+    return f"{prefix}_{entity_info.get('name', 'entity').replace(' ', '_')}.pdf"
 
 
 class ZakatDocumentGenerator:
     """
     Generates Zakat compliance documentation
     """
+    def __init__(self):
+        self.title_style = _STYLES["Title"]
+        self.heading_style = _STYLES["Heading2"]
+        self.subheading_style = _STYLES["Heading4"]
+        self.body_style = _STYLES["BodyText"]
+    
+    def _entity_info(self, entity_info):
+        """
+        Entity information block as a single paragraph
+        """
+        return Paragraph(
+            ENTITY_INFO_TEMPLATE.format(
+                name=escape(entity_info.get("name", "")),
+                registration=escape(entity_info.get("registration", "")),
+                zakat_year=escape(entity_info.get("zakat_year", ""))
+            ),
+            self.body_style
+        )
+    
+    def _table(self, rows, label_width=60 * mm, total_row=False):
+        """
+        Two-column label/value table laid out in one pass
+        """
+        table = Table(rows, colWidths=(label_width, None), hAlign="LEFT", style=_TABLE_STYLE)
+        if total_row:
+            table.setStyle(_TOTAL_ROW_STYLE)
+        return table
+    
+    def _text(self, text):
+        """
+        Free text (e.g. LLM advice) as a paragraph, keeping its line breaks
+        """
+        return Paragraph(escape(text).replace("\n", "<br/>"), self.body_style)
+    
+    def _build(self, story):
+        """
+        Render a story to PDF bytes in memory
+        """
+        buffer = io.BytesIO()
+        SimpleDocTemplate(buffer, pagesize=A4).build(story)
+        return buffer.getvalue()
+    
     def generate_zakat_certificate(self, entity_info, calculation_results):
         """
-        Generate a Zakat payment certificate
-        """
-        pdf = FPDF()
-        pdf.add_page()
-        
-        # Header
-        pdf.set_font("Arial", "B", 16)
-        pdf.cell(0, 10, "ZAKAT COMPLIANCE CERTIFICATE", ln=True, align="C")
-        pdf.ln(10)
-        
-        # Entity Information
-        pdf.set_font("Arial", "B", 12)
-        pdf.cell(0, 10, "Entity Information", ln=True)
-        pdf.set_font("Arial", "", 12)
-        pdf.cell(60, 8, "Entity Name:", 0)
-        pdf.cell(0, 8, entity_info.get("name", ""), ln=True)
-        pdf.cell(60, 8, "Registration Number:", 0)
-        pdf.cell(0, 8, entity_info.get("registration", ""), ln=True)
-        pdf.cell(60, 8, "Zakat Year:", 0)
-        pdf.cell(0, 8, entity_info.get("zakat_year", ""), ln=True)
-        pdf.ln(10)
-        
-        # Calculation Summary
-        pdf.set_font("Arial", "B", 12)
-        pdf.cell(0, 10, "Zakat Calculation Summary", ln=True)
-        pdf.set_font("Arial", "", 12)
-        pdf.cell(60, 8, "Total Zakatable Assets:", 0)
-        pdf.cell(0, 8, f"${calculation_results['total_zakatable_assets']:,.2f}", ln=True)
-        pdf.cell(60, 8, "Total Deductible Liabilities:", 0)
-        pdf.cell(0, 8, f"${calculation_results['total_deductible_liabilities']:,.2f}", ln=True)
-        pdf.cell(60, 8, "Zakat Base:", 0)
-        pdf.cell(0, 8, f"${calculation_results['zakat_base']:,.2f}", ln=True)
-        pdf.cell(60, 8, "Nisab Threshold:", 0)
-        pdf.cell(0, 8, f"${calculation_results['nisab_value']:,.2f}", ln=True)
-        pdf.cell(60, 8, "Zakat Rate:", 0)
-        pdf.cell(0, 8, f"{calculation_results['zakat_rate'] * 100}%", ln=True)
-        pdf.cell(60, 8, "Zakat Amount Due:", 0)
-        pdf.cell(0, 8, f"${calculation_results['zakat_amount']:,.2f}", ln=True)
-        pdf.ln(10)
-        
-        # Compliance Statement
-        pdf.set_font("Arial", "B", 12)
-        pdf.cell(0, 10, "Compliance Statement", ln=True)
-        pdf.set_font("Arial", "", 12)
-        compliance_text = "This is to certify that the above Zakat calculation has been performed in accordance with AAOIFI FAS 9 standards."
-        pdf.multi_cell(0, 8, compliance_text)
-        pdf.ln(10)
-        
-        # Signature
-        pdf.cell(60, 8, "Date of Calculation:", 0)
-        pdf.cell(0, 8, calculation_results["calculation_date"], ln=True)
-        pdf.ln(20)
-        pdf.cell(80, 8, "Authorized Signature:", 0)
-        pdf.cell(0, 8, "_________________________", ln=True)
-        
-        # Save the PDF to a temporary file
-        filename = f"zakat_certificate_{entity_info.get('name', 'entity').replace(' ', '_')}.pdf"
-        pdf.output(filename)
-        return filename
+        Generate a Zakat payment certificate as PDF bytes
+        """
+        story = [
+            # Header
+            Paragraph("ZAKAT COMPLIANCE CERTIFICATE", self.title_style),
+            
+            # Entity Information
+            Paragraph("Entity Information", self.heading_style),
+            self._entity_info(entity_info),
+            
+            # Calculation Summary
+            Paragraph("Zakat Calculation Summary", self.heading_style),
+            self._table([
+                ["Total Zakatable Assets:", _money(calculation_results['total_zakatable_assets'])],
+                ["Total Deductible Liabilities:", _money(calculation_results['total_deductible_liabilities'])],
+                ["Zakat Base:", _money(calculation_results['zakat_base'])],
+                ["Nisab Threshold:", _money(calculation_results['nisab_value'])],
+                ["Zakat Rate:", f"{calculation_results['zakat_rate'] * 100}%"],
+                ["Zakat Amount Due:", _money(calculation_results['zakat_amount'])]
+            ]),
+            
+            # Compliance Statement
+            Paragraph("Compliance Statement", self.heading_style),
+            Paragraph(
+                "This is to certify that the above Zakat calculation has been performed in accordance with AAOIFI FAS 9 standards.",
+                self.body_style
+            ),
+            Spacer(1, 10 * mm),
+            
+            # Signature
+            self._table([["Date of Calculation:", calculation_results["calculation_date"]]]),
+            Spacer(1, 20 * mm),
+            self._table([["Authorized Signature:", "_________________________"]], label_width=80 * mm)
+        ]
+        
+        return self._build(story)
     
     def generate_detailed_report(self, entity_info, financial_data, calculation_results, compliance_advice):
         """
-        Generate a detailed Zakat compliance report
-        """
-        pdf = FPDF()
-        pdf.add_page()
-        
-        # Header
-        pdf.set_font("Arial", "B", 16)
-        pdf.cell(0, 10, "DETAILED ZAKAT COMPLIANCE REPORT", ln=True, align="C")
-        pdf.ln(10)
-        
-        # Entity Information
-        pdf.set_font("Arial", "B", 12)
-        pdf.cell(0, 10, "Entity Information", ln=True)
-        pdf.set_font("Arial", "", 12)
-        pdf.cell(60, 8, "Entity Name:", 0)
-        pdf.cell(0, 8, entity_info.get("name", ""), ln=True)
-        pdf.cell(60, 8, "Registration Number:", 0)
-        pdf.cell(0, 8, entity_info.get("registration", ""), ln=True)
-        pdf.cell(60, 8, "Zakat Year:", 0)
-        pdf.cell(0, 8, entity_info.get("zakat_year", ""), ln=True)
-        pdf.ln(10)
-        
-        # Asset Classification
-        pdf.set_font("Arial", "B", 12)
-        pdf.cell(0, 10, "Asset Classification", ln=True)
-        pdf.set_font("Arial", "", 12)
+        Generate a detailed Zakat compliance report as PDF bytes
+        """
+        classified = calculation_results["classified_accounts"]
         
-        # Zakatable Assets
-        pdf.set_font("Arial", "B", 11)
-        pdf.cell(0, 8, "Zakatable Assets:", ln=True)
-        pdf.set_font("Arial", "", 11)
-        for asset, value in calculation_results["classified_accounts"]["zakatable_assets"].items():
-            pdf.cell(100, 6, asset, 0)
-            pdf.cell(0, 6, f"${value:,.2f}", ln=True)
-        pdf.set_font("Arial", "B", 11)
-        pdf.cell(100, 8, "Total Zakatable Assets:", 0)
-        pdf.cell(0, 8, f"${calculation_results['total_zakatable_assets']:,.2f}", ln=True)
-        pdf.ln(5)
-        
-        # Non-Zakatable Assets
-        pdf.set_font("Arial", "B", 11)
-        pdf.cell(0, 8, "Non-Zakatable Assets:", ln=True)
-        pdf.set_font("Arial", "", 11)
-        for asset, value in calculation_results["classified_accounts"]["non_zakatable_assets"].items():
-            pdf.cell(100, 6, asset, 0)
-            pdf.cell(0, 6, f"${value:,.2f}", ln=True)
-        pdf.ln(5)
+        story = [
+            # Header
+            Paragraph("DETAILED ZAKAT COMPLIANCE REPORT", self.title_style),
+            
+            # Entity Information
+            Paragraph("Entity Information", self.heading_style),
+            self._entity_info(entity_info),
+            
+            # Asset Classification
+            Paragraph("Asset Classification", self.heading_style),
+            
+            # Zakatable Assets
+            Paragraph("Zakatable Assets:", self.subheading_style),
+            self._table(
+                [[asset, _money(value)] for asset, value in classified["zakatable_assets"].items()]
+                + [["Total Zakatable Assets:", _money(calculation_results['total_zakatable_assets'])]],
+                label_width=100 * mm,
+                total_row=True
+            ),
+            
+            # Non-Zakatable Assets
+            Paragraph("Non-Zakatable Assets:", self.subheading_style)
+        ]
+        non_zakatable = [[asset, _money(value)] for asset, value in classified["non_zakatable_assets"].items()]
+        if non_zakatable:
+            story.append(self._table(non_zakatable, label_width=100 * mm))
         
-        # Deductible Liabilities
-        pdf.set_font("Arial", "B", 11)
-        pdf.cell(0, 8, "Deductible Liabilities:", ln=True)
-        pdf.set_font("Arial", "", 11)
-        for liability, value in calculation_results["classified_accounts"]["deductible_liabilities"].items():
-            pdf.cell(100, 6, liability, 0)
-            pdf.cell(0, 6, f"${value:,.2f}", ln=True)
-        pdf.set_font("Arial", "B", 11)
-        pdf.cell(100, 8, "Total Deductible Liabilities:", 0)
-        pdf.cell(0, 8, f"${calculation_results['total_deductible_liabilities']:,.2f}", ln=True)
-        pdf.ln(10)
-        
-        # Calculation Summary
-        pdf.set_font("Arial", "B", 12)
-        pdf.cell(0, 10, "Zakat Calculation Summary", ln=True)
-        pdf.set_font("Arial", "", 12)
-        pdf.cell(100, 8, "Zakat Base:", 0)
-        pdf.cell(0, 8, f"${calculation_results['zakat_base']:,.2f}", ln=True)
-        pdf.cell(100, 8, "Nisab Threshold:", 0)
-        pdf.cell(0, 8, f"${calculation_results['nisab_value']:,.2f}", ln=True)
-        pdf.cell(100, 8, "Exceeds Nisab:", 0)
-        pdf.cell(0, 8, "Yes" if calculation_results['exceeds_nisab'] else "No", ln=True)
-        pdf.cell(100, 8, "Zakat Rate:", 0)
-        pdf.cell(0, 8, f"{calculation_results['zakat_rate'] * 100}%", ln=True)
-        pdf.cell(100, 8, "Zakat Amount Due:", 0)
-        pdf.cell(0, 8, f"${calculation_results['zakat_amount']:,.2f}", ln=True)
-        pdf.ln(10)
-        
-        # Add a new page for compliance advice
-        pdf.add_page()
-        
-        # Compliance Advice
-        pdf.set_font("Arial", "B", 12)
-        pdf.cell(0, 10, "Compliance Assessment & Recommendations", ln=True)
-        pdf.set_font("Arial", "", 12)
-        pdf.multi_cell(0, 8, compliance_advice)
-        
-        # Save the PDF to a temporary file
-        filename = f"zakat_detailed_report_{entity_info.get('name', 'entity').replace(' ', '_')}.pdf"
-        pdf.output(filename)
-        return filename
+        story += [
+            # Deductible Liabilities
+            Paragraph("Deductible Liabilities:", self.subheading_style),
+            self._table(
+                [[liability, _money(value)] for liability, value in classified["deductible_liabilities"].items()]
+                + [["Total Deductible Liabilities:", _money(calculation_results['total_deductible_liabilities'])]],
+                label_width=100 * mm,
+                total_row=True
+            ),
+            
+            # Calculation Summary
+            Paragraph("Zakat Calculation Summary", self.heading_style),
+            self._table([
+                ["Zakat Base:", _money(calculation_results['zakat_base'])],
+                ["Nisab Threshold:", _money(calculation_results['nisab_value'])],
+                ["Exceeds Nisab:", "Yes" if calculation_results['exceeds_nisab'] else "No"],
+                ["Zakat Rate:", f"{calculation_results['zakat_rate'] * 100}%"],
+                ["Zakat Amount Due:", _money(calculation_results['zakat_amount'])]
+            ], label_width=100 * mm),
+            
+            # Compliance Advice on a new page
+            PageBreak(),
+            Paragraph("Compliance Assessment & Recommendations", self.heading_style),
+            self._text(compliance_advice)
+        ]
+        
+        return self._build(story)
 
 
+@st.cache_data
 def create_sample_financial_data():
     """
     Create sample financial data for demonstration
@@ -392,6 +778,48 @@ def create_sample_financial_data():
     }
 
 
+@st.cache_resource(ttl=METAL_PRICES_TTL)
+def get_calculator(standard="FAS_9"):
+    """
+    Shared ZakatCalculator per standard, rebuilt once per metal-price window
+    """
+    return ZakatCalculator(standard)
+
+
+@st.cache_resource
+def get_advisor():
+    """
+    Shared ZakatComplianceAdvisor, so the LLM client is only set up once
+    """
+    return ZakatComplianceAdvisor()
+
+
+@st.cache_resource
+def get_document_generator():
+    """
+    Shared ZakatDocumentGenerator
+    """
+    return ZakatDocumentGenerator()
+
+
+@st.cache_data
+def render_zakat_certificate(entity_info, calculation_results):
+    """
+    Zakat certificate PDF bytes, only re-rendered when the entity or results change
+    """
+    return get_document_generator().generate_zakat_certificate(entity_info, calculation_results)
+
+
+@st.cache_data
+def render_detailed_report(entity_info, financial_data, calculation_results, compliance_advice):
+    """
+    Detailed report PDF bytes, only re-rendered when its inputs change
+    """
+    return get_document_generator().generate_detailed_report(
+        entity_info, financial_data, calculation_results, compliance_advice
+    )
+
+
 def main():
     st.set_page_config(page_title="Islamic Finance Zakat Calculator", layout="wide")
     
@@ -419,57 +847,58 @@ def main():
     if use_sample:
         financial_data = sample_data
     else:
-        financial_data = {"balance_sheet": {}}
-        
-        # Dynamic form for balance sheet entries
-        st.subheader("Assets")
-        col1, col2 = st.columns(2)
-        with col1:
-            cash = st.number_input("Cash and bank balances", value=0.0, format="%.2f")
-            receivables = st.number_input("Trade receivables", value=0.0, format="%.2f")
-            inventory = st.number_input("Inventory", value=0.0, format="%.2f")
-            short_investments = st.number_input("Short-term investments", value=0.0, format="%.2f")
-            prepaid = st.number_input("Prepaid expenses", value=0.0, format="%.2f")
-        with col2:
-            property_equipment = st.number_input("Property and equipment", value=0.0, format="%.2f")
-            intangible = st.number_input("Intangible assets", value=0.0, format="%.2f")
-            long_investments = st.number_input("Long-term investments", value=0.0, format="%.2f")
+        # Inputs are batched in a form, so typing does not rerun the page per field
+        with st.form("zakat_inputs"):
+            st.subheader("Assets")
+            col1, col2 = st.columns(2)
+            with col1:
+                cash = st.number_input("Cash and bank balances", value=0.0, format="%.2f")
+                receivables = st.number_input("Trade receivables", value=0.0, format="%.2f")
+                inventory = st.number_input("Inventory", value=0.0, format="%.2f")
+                short_investments = st.number_input("Short-term investments", value=0.0, format="%.2f")
+                prepaid = st.number_input("Prepaid expenses", value=0.0, format="%.2f")
+            with col2:
+                property_equipment = st.number_input("Property and equipment", value=0.0, format="%.2f")
+                intangible = st.number_input("Intangible assets", value=0.0, format="%.2f")
+                long_investments = st.number_input("Long-term investments", value=0.0, format="%.2f")
         
-        st.subheader("Liabilities and Equity")
-        col1, col2 = st.columns(2)
-        with col1:
-            payables = st.number_input("Trade payables", value=0.0, format="%.2f")
-            accrued = st.number_input("Accrued expenses", value=0.0, format="%.2f")
-            short_borrowings = st.number_input("Short-term borrowings", value=0.0, format="%.2f")
-            tax_payable = st.number_input("Tax payable", value=0.0, format="%.2f")
-        with col2:
-            long_loans = st.number_input("Long-term loans", value=0.0, format="%.2f")
-            share_capital = st.number_input("Share capital", value=0.0, format="%.2f")
-            retained = st.number_input("Retained earnings", value=0.0, format="%.2f")
+            st.subheader("Liabilities and Equity")
+            col1, col2 = st.columns(2)
+            with col1:
+                payables = st.number_input("Trade payables", value=0.0, format="%.2f")
+                accrued = st.number_input("Accrued expenses", value=0.0, format="%.2f")
+                short_borrowings = st.number_input("Short-term borrowings", value=0.0, format="%.2f")
+                tax_payable = st.number_input("Tax payable", value=0.0, format="%.2f")
+            with col2:
+                long_loans = st.number_input("Long-term loans", value=0.0, format="%.2f")
+                share_capital = st.number_input("Share capital", value=0.0, format="%.2f")
+                retained = st.number_input("Retained earnings", value=0.0, format="%.2f")
             
-        # Update financial data
-        financial_data["balance_sheet"] = {
-            "Cash and bank balances": cash,
-            "Trade receivables": receivables,
-            "Inventory": inventory,
-            "Short-term investments": short_investments,
-            "Prepaid expenses": prepaid,
-            "Property and equipment": property_equipment,
-            "Intangible assets": intangible,
-            "Long-term investments": long_investments,
-            "Trade payables": payables,
-            "Accrued expenses": accrued,
-            "Short-term borrowings": short_borrowings,
-            "Tax payable": tax_payable,
-            "Long-term loans": long_loans,
-            "Share capital": share_capital,
-            "Retained earnings": retained
-        }
+            # Only a submitted form rebuilds the balance sheet
+            if st.form_submit_button("Save Inputs"):
+                st.session_state["balance_sheet"] = {
+                    "Cash and bank balances": cash,
+                    "Trade receivables": receivables,
+                    "Inventory": inventory,
+                    "Short-term investments": short_investments,
+                    "Prepaid expenses": prepaid,
+                    "Property and equipment": property_equipment,
+                    "Intangible assets": intangible,
+                    "Long-term investments": long_investments,
+                    "Trade payables": payables,
+                    "Accrued expenses": accrued,
+                    "Short-term borrowings": short_borrowings,
+                    "Tax payable": tax_payable,
+                    "Long-term loans": long_loans,
+                    "Share capital": share_capital,
+                    "Retained earnings": retained
+                }
+        financial_data = {"balance_sheet": st.session_state.get("balance_sheet", {})}
     
     # Process button
     if st.button("Calculate Zakat"):
         # Calculate Zakat
-        calculator = ZakatCalculator()
+        calculator = get_calculator()
         calculation_results = calculator.calculate_zakat_amount(financial_data)
         
         # Display results
@@ -479,40 +908,38 @@ def main():
         st.subheader("Summary")
         col1, col2, col3 = st.columns(3)
         with col1:
-            st.metric("Total Zakatable Assets", f"${calculation_results['total_zakatable_assets']:,.2f}")
+            st.metric("Total Zakatable Assets", _money(calculation_results['total_zakatable_assets']))
         with col2:
-            st.metric("Total Deductible Liabilities", f"${calculation_results['total_deductible_liabilities']:,.2f}")
+            st.metric("Total Deductible Liabilities", _money(calculation_results['total_deductible_liabilities']))
         with col3:
-            st.metric("Zakat Base", f"${calculation_results['zakat_base']:,.2f}")
+            st.metric("Zakat Base", _money(calculation_results['zakat_base']))
             
         col1, col2, col3 = st.columns(3)
         with col1:
-            st.metric("Nisab Threshold", f"${calculation_results['nisab_value']:,.2f}")
+            st.metric("Nisab Threshold", _money(calculation_results['nisab_value']))
         with col2:
             st.metric("Exceeds Nisab", "Yes" if calculation_results['exceeds_nisab'] else "No")
         with col3:
-            st.metric("Zakat Amount Due", f"${calculation_results['zakat_amount']:,.2f}")
+            st.metric("Zakat Amount Due", _money(calculation_results['zakat_amount']))
         
         # Detailed breakdown
         st.subheader("Detailed Breakdown")
         
         # Zakatable Assets
         st.write("**Zakatable Assets**")
-        asset_df = pd.DataFrame(list(calculation_results["classified_accounts"]["zakatable_assets"].items()), 
-                               columns=["Account", "Amount"])
-        st.dataframe(asset_df)
+        asset_accounts = calculation_results["classified_accounts"]["zakatable_assets"]
+        st.dataframe({"Account": list(asset_accounts), "Amount": list(asset_accounts.values())})
         
         # Deductible Liabilities
         st.write("**Deductible Liabilities**")
-        liability_df = pd.DataFrame(list(calculation_results["classified_accounts"]["deductible_liabilities"].items()), 
-                                  columns=["Account", "Amount"])
-        st.dataframe(liability_df)
+        liability_accounts = calculation_results["classified_accounts"]["deductible_liabilities"]
+        st.dataframe({"Account": list(liability_accounts), "Amount": list(liability_accounts.values())})
         
         # Generate compliance advice (mock for demo purposes)
         st.header("Compliance Analysis")
         
         # Create advisor object
-        advisor = ZakatComplianceAdvisor()
+        advisor = get_advisor()
         
         # This section would use the LLM in a real implementation
         # For demo, we'll use sample responses
@@ -567,8 +994,7 @@ def main():
                - Permissible as long as a full lunar year (Hawl) passes between calculations
             """
         else:
-            compliance_advice = advisor.get_compliance_advice(financial_data, calculation_results)
-            optimization_suggestions = advisor.get_optimization_suggestions(financial_data, calculation_results)
+            compliance_advice, optimization_suggestions = advisor.get_both(financial_data, calculation_results)
         
         st.subheader("Compliance Assessment")
         st.write(compliance_advice)
@@ -585,19 +1011,22 @@ def main():
             "zakat_year": zakat_year
         }
         
-        doc_generator = ZakatDocumentGenerator()
-        
         col1, col2 = st.columns(2)
         with col1:
-            if st.button("Generate Zakat Certificate"):
-                cert_file = doc_generator.generate_zakat_certificate(entity_info, calculation_results)
-                st.success(f"Zakat Certificate generated: {cert_file}")
+            st.download_button(
+                "Download Zakat Certificate",
+                data=render_zakat_certificate(entity_info, calculation_results),
+                file_name=document_filename("zakat_certificate", entity_info),
+                mime="application/pdf"
+            )
                 
         with col2:
-            if st.button("Generate Detailed Report"):
-                report_file = doc_generator.generate_detailed_report(entity_info, financial_data, 
-                                                                    calculation_results, compliance_advice)
-                st.success(f"Detailed Report generated: {report_file}")
+            st.download_button(
+                "Download Detailed Report",
+                data=render_detailed_report(entity_info, financial_data, calculation_results, compliance_advice),
+                file_name=document_filename("zakat_detailed_report", entity_info),
+                mime="application/pdf"
+            )
 
 
 if __name__ == "__main__":